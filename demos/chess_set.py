@@ -13,6 +13,8 @@ import traceback  # 添加traceback模块用于详细错误信息
 import random
 import asyncio
 import logging
+from types import MappingProxyType
+from typing import Final
 from blendermcp.client import BlenderMCPClient
 
 # 确保可以导入客户端类
@@ -25,6 +27,36 @@ DEBUG = True  # 可以控制是否输出详细日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 棋盘格索引(0-7)对应的坐标
+_GRID: Final = tuple((i - 3.5) * 0.5 for i in range(8))
+
+# 黑白两方的颜色和棋盘格缩放，元组在JSON中与列表序列化结果相同
+WHITE: Final = (0.9, 0.9, 0.9, 1.0)
+BLACK: Final = (0.1, 0.1, 0.1, 1.0)
+SQUARE_SCALE: Final = (0.25, 0.25, 0.01)
+
+# 根据棋子类型设置不同的形状和大小
+_PIECE_PARAMS: Final = MappingProxyType({
+    "pawn": {"object_type": "MESH", "height": 0.3, "scale": [0.1, 0.1, 0.3]},
+    "rook": {"object_type": "MESH", "height": 0.4, "scale": [0.15, 0.15, 0.4]},
+    "knight": {"object_type": "MESH", "height": 0.4, "scale": [0.12, 0.12, 0.4]},
+    "bishop": {"object_type": "MESH", "height": 0.5, "scale": [0.12, 0.12, 0.5]},
+    "queen": {"object_type": "MESH", "height": 0.6, "scale": [0.15, 0.15, 0.6]},
+    "king": {"object_type": "MESH", "height": 0.7, "scale": [0.15, 0.15, 0.7]}
+})
+
+# orjson直接输出UTF-8，比json.dumps更快
+try:
+    import orjson
+
+    def to_json(obj):
+        """将对象序列化为JSON文本"""
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    def to_json(obj):
+        """将对象序列化为JSON文本"""
+        return json.dumps(obj, ensure_ascii=False)
+
 def debug_print(message):
     """调试信息输出函数"""
     if DEBUG:
@@ -53,7 +85,7 @@ def get_object_name(response):
         debug_print("警告: 响应为None")
         return None
         
-    debug_print(f"响应类型: {type(response)}, 内容: {json.dumps(response, ensure_ascii=False)[:100]}")
+    debug_print(f"响应类型: {type(response)}, 内容: {to_json(response)[:100]}")
     
     if isinstance(response, dict):
         if "status" in response and response["status"] == "error":
@@ -71,98 +103,162 @@ def get_object_name(response):
         if "name" in response:
             return response["name"]
     
-    debug_print(f"无法从响应中提取对象名称: {json.dumps(response, ensure_ascii=False)[:100]}")
+    debug_print(f"无法从响应中提取对象名称: {to_json(response)[:100]}")
     return None
 
+def get_object_names(response):
+    """从批量响应中按顺序获取对象名称列表"""
+    if not response or not isinstance(response, dict):
+        debug_print("警告: 批量响应为空")
+        return []
+
+    result = response.get("result")
+    items = result.get("items", []) if isinstance(result, dict) else result
+    if not isinstance(items, list):
+        debug_print(f"无法从批量响应中提取对象列表: {to_json(response)[:100]}")
+        return []
+
+    return [item if isinstance(item, str) else get_object_name({"result": item}) for item in items]
+
 async def create_chess_board(client: BlenderMCPClient):
-    """创建棋盘"""
-    # 创建棋盘底座
-    board_base = await client.create_object(
-        object_type="MESH",
-        object_name="chess_board",
-        location=[0, 0, -0.1], 
-        scale=[4, 4, 0.2]
-    )
-    board_name = get_object_name(board_base)
-    logger.info(f"创建棋盘底座: {board_base}")
-    
-    # 为棋盘底座设置木质材质
-    await client.set_material(
-        object_name=board_name,
-        material_name="board_wood",
-        color=[0.4, 0.2, 0.1, 1.0]  # 使用列表而不是元组
-    )
-    
-    # 创建64个棋盘格
-    for i in range(8):
-        for j in range(8):
-            # 计算位置
-            x = (i - 3.5) * 0.5
-            y = (j - 3.5) * 0.5
-            # 确定颜色
-            is_white = (i + j) % 2 == 0
-            color = [0.9, 0.9, 0.9, 1.0] if is_white else [0.1, 0.1, 0.1, 1.0]  # 使用列表
-            
-            # 创建格子
-            square = await client.create_object(
-                object_type="MESH",
-                object_name=f"square_{i}_{j}",
-                location=[x, y, 0],
-                scale=[0.25, 0.25, 0.01]
-            )
-            square_name = get_object_name(square)
-            logger.info(f"创建棋盘格 {i},{j}: {square}")
-            
-            # 设置材质
-            material_name = f"{'white' if is_white else 'black'}_square"
-            await client.set_material(
-                object_name=square_name,
-                material_name=material_name,
-                color=color
-            )
+    """创建棋盘
+
+    棋盘格只创建一黑一白两个源对象，其余62个是共享网格和材质的关联实例
+    """
+    squares = [(i, j) for i in range(8) for j in range(8)]
+    # (0, 0)为白格，(0, 1)为黑格
+    sources = {True: squares[0], False: squares[1]}
+
+    specs = [{
+        "object_type": "MESH",
+        "object_name": "chess_board",
+        "location": [0, 0, -0.1],
+        "scale": [4, 4, 0.2]
+    }]
+    materials = [{
+        "material_name": "board_wood",
+        "color": [0.4, 0.2, 0.1, 1.0]  # 使用列表而不是元组
+    }]
+
+    for is_white, (i, j) in sources.items():
+        specs.append({
+            "object_type": "MESH",
+            "object_name": f"square_{i}_{j}",
+            "location": (_GRID[i], _GRID[j], 0.0),
+            "scale": SQUARE_SCALE
+        })
+        materials.append({
+            "material_name": f"{'white' if is_white else 'black'}_square",
+            "color": WHITE if is_white else BLACK
+        })
+
+    response = await client.create_objects(specs)
+    names = get_object_names(response)
+    logger.info(f"创建棋盘: {len(names)}个对象")
+
+    # 只有在拿到服务器返回的对象名称后才需要第二次请求
+    for material, name in zip(materials, names):
+        material["object_name"] = name
+    await client.set_materials(materials[:len(names)])
+
+    # 材质设置在网格数据上，实例创建后自动沿用
+    source_names = dict(zip(sources, names[1:]))
+    response = await client.create_linked_instances([
+        {
+            "source_name": source_names[(i + j) & 1 == 0],
+            "instance_name": f"square_{i}_{j}",
+            "location": (_GRID[i], _GRID[j], 0.0)
+        }
+        for i, j in squares if (i, j) not in sources.values()
+    ])
+    logger.info(f"创建棋盘格实例: {len(get_object_names(response))}个")
+
+def chess_piece_spec(piece_type: str, is_white: bool, position: tuple):
+    """构建棋子的对象参数和材质参数
 
-async def create_chess_piece(client: BlenderMCPClient, piece_type: str, is_white: bool, position: tuple):
-    """创建棋子
-    
     Args:
-        client: BlenderMCP客户端
         piece_type: 棋子类型 (pawn, rook, knight, bishop, queen, king)
         is_white: 是否为白方棋子
         position: 棋盘位置 (x, y)
+
+    Returns:
+        tuple: (对象参数, 材质参数)
     """
-    # 计算实际位置
-    x = (position[0] - 3.5) * 0.5
-    y = (position[1] - 3.5) * 0.5
-    color = [0.9, 0.9, 0.9, 1.0] if is_white else [0.1, 0.1, 0.1, 1.0]  # 使用列表
+    color = WHITE if is_white else BLACK
     side = "white" if is_white else "black"
     
-    # 根据棋子类型设置不同的形状和大小
-    piece_params = {
-        "pawn": {"object_type": "MESH", "height": 0.3, "scale": [0.1, 0.1, 0.3]},
-        "rook": {"object_type": "MESH", "height": 0.4, "scale": [0.15, 0.15, 0.4]},
-        "knight": {"object_type": "MESH", "height": 0.4, "scale": [0.12, 0.12, 0.4]},
-        "bishop": {"object_type": "MESH", "height": 0.5, "scale": [0.12, 0.12, 0.5]},
-        "queen": {"object_type": "MESH", "height": 0.6, "scale": [0.15, 0.15, 0.6]},
-        "king": {"object_type": "MESH", "height": 0.7, "scale": [0.15, 0.15, 0.7]}
+    params = _PIECE_PARAMS[piece_type]
+    spec = {
+        "object_type": params["object_type"],
+        "object_name": f"{side}_{piece_type}_{position[0]}_{position[1]}",
+        "location": (_GRID[position[0]], _GRID[position[1]], params["height"]),
+        "scale": params["scale"]
+    }
+    # 设置材质，只使用基本参数
+    material = {
+        "material_name": f"{side}_{piece_type}_material",
+        "color": color
     }
+    return spec, material
+
+async def create_chess_piece(client: BlenderMCPClient, piece_type: str, is_white: bool, position: tuple):
+    """创建单个棋子
     
-    params = piece_params[piece_type]
-    piece = await client.create_object(
-        object_type=params["object_type"],
-        object_name=f"{side}_{piece_type}_{position[0]}_{position[1]}",
-        location=[x, y, params["height"]],
-        scale=params["scale"]
-    )
+    Args:
+        client: BlenderMCP客户端
+        piece_type: 棋子类型 (pawn, rook, knight, bishop, queen, king)
+        is_white: 是否为白方棋子
+        position: 棋盘位置 (x, y)
+    """
+    spec, material = chess_piece_spec(piece_type, is_white, position)
+    piece = await client.create_object(**spec)
     piece_name = get_object_name(piece)
-    logger.info(f"创建{side} {piece_type}: {piece}")
+    logger.info(f"创建{spec['object_name']}: {piece}")
     
-    # 设置材质，只使用基本参数
-    material_name = f"{side}_{piece_type}_material"
-    await client.set_material(
-        object_name=piece_name,
-        material_name=material_name,
-        color=color
-    )
+    await client.set_material(object_name=piece_name, **material)
+
+async def create_chess_pieces(client: BlenderMCPClient):
+    """创建全部32个棋子
+
+    每方每种棋子只创建一个源对象，其余同类棋子作为关联实例创建
+    """
+    piece_types = ["rook", "knight", "bishop", "queen", "king", "bishop", "knight", "rook"]
+    pieces = []
+    for is_white, pawn_row, back_row in ((True, 1, 0), (False, 6, 7)):
+        # 兵
+        pieces.extend(chess_piece_spec("pawn", is_white, (i, pawn_row)) for i in range(8))
+        # 其他棋子
+        pieces.extend(chess_piece_spec(piece_type, is_white, (i, back_row))
+                      for i, piece_type in enumerate(piece_types))
+
+    # 同方同类棋子的材质名相同，以此分组
+    sources = {}
+    instances = []
+    for spec, material in pieces:
+        key = material["material_name"]
+        if key in sources:
+            instances.append((key, spec))
+        else:
+            sources[key] = (spec, material)
+
+    response = await client.create_objects([spec for spec, _ in sources.values()])
+    names = get_object_names(response)
+    logger.info(f"创建棋子: {len(names)}个")
+
+    await client.set_materials([
+        dict(material, object_name=name) for (_, material), name in zip(sources.values(), names)
+    ])
+
+    source_names = dict(zip(sources, names))
+    response = await client.create_linked_instances([
+        {
+            "source_name": source_names[key],
+            "instance_name": spec["object_name"],
+            "location": spec["location"]
+        }
+        for key, spec in instances if key in source_names
+    ])
+    logger.info(f"创建棋子实例: {len(get_object_names(response))}个")
 
 async def create_chess_set():
     """创建完整的国际象棋套装"""
@@ -174,30 +270,16 @@ async def create_chess_set():
         
         # 清除现有场景中的对象（可选）
         scene_info = await client.get_scene_info()
-        if scene_info.get("objects"):
-            for obj in scene_info["objects"]:
-                if obj["name"] != "Camera":  # 保留相机
-                    await client.delete_object(obj["name"])
-        
-        # 创建棋盘
-        await create_chess_board(client)
+        names = [obj["name"] for obj in scene_info.get("objects", [])
+                 if obj["name"] != "Camera"]  # 保留相机
+        if names:
+            await client.delete_objects(names)
         
-        # 创建白方棋子
-        # 白方兵
-        for i in range(8):
-            await create_chess_piece(client, "pawn", True, (i, 1))
-        # 白方其他棋子
-        piece_types = ["rook", "knight", "bishop", "queen", "king", "bishop", "knight", "rook"]
-        for i, piece_type in enumerate(piece_types):
-            await create_chess_piece(client, piece_type, True, (i, 0))
-            
-        # 创建黑方棋子
-        # 黑方兵
-        for i in range(8):
-            await create_chess_piece(client, "pawn", False, (i, 6))
-        # 黑方其他棋子
-        for i, piece_type in enumerate(piece_types):
-            await create_chess_piece(client, piece_type, False, (i, 7))
+        # 棋盘和棋子之间没有数据依赖，并发创建
+        await asyncio.gather(
+            create_chess_board(client),
+            create_chess_pieces(client)
+        )
             
         # 设置相机和灯光
         # 添加日光
@@ -230,12 +312,17 @@ async def create_chess_set():
         
         logger.info("国际象棋套装创建完成")
 
-except Exception as e:
-            logger.error(f"创建国际象棋套装时出错: {e}")
-            logger.error(traceback.format_exc())
-finally:
-            await client.stop()
-            logger.info("已断开与Blender的连接")
+    except Exception as e:
+        logger.error(f"创建国际象棋套装时出错: {e}")
+        logger.error(traceback.format_exc())
+    finally:
+        await client.stop()
+        logger.info("已断开与Blender的连接")
 
 if __name__ == "__main__":
-    asyncio.run(create_chess_set())
+    # 如果安装了uvloop则使用更快的事件循环
+    try:
+        from uvloop import run
+    except ImportError:
+        from asyncio import run
+    run(create_chess_set())
@@ -4,6 +4,8 @@ BlenderMCP高级功能示例脚本
 演示如何使用新的MCP客户端系统的高级功能
 """
 
+import sys
+import json
 import asyncio
 import logging
 from pathlib import Path
@@ -13,136 +15,135 @@ from blendermcp.client import BlenderMCPClient
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def demonstrate_advanced_features():
+# 示例配置文件，提供服务器地址和各类工具的默认参数
+CONFIG_PATH = Path(__file__).parent / "mcp.json"
+
+def load_config(path: Path = CONFIG_PATH) -> dict:
+    """读取示例配置，文件不存在时使用默认的服务器地址"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"未找到配置文件: {path}，使用默认配置")
+        return {}
+
+def tool_parameters(config: dict, category: str) -> dict:
+    """获取配置中某类工具的默认参数"""
+    return config.get("tools", {}).get(category, {}).get("parameters", {})
+
+def get_object_name(response: dict, default: str) -> str:
+    """从响应中获取服务器实际使用的对象名称"""
+    result = response.get("result") if isinstance(response, dict) else None
+    if isinstance(result, dict):
+        return result.get("object_name", default)
+    return default
+
+async def demonstrate_advanced_features(config: dict):
     """演示高级功能的使用"""
     try:
-        # 创建客户端实例，使用自定义配置文件
-        config_path = Path(__file__).parent / "mcp.json"
-        client = BlenderMCPClient(str(config_path))
-        
-        # 连接到服务器
-        await client.connect()
-        logger.info("已连接到Blender服务器")
-        
-        # 列出所有可用工具
-        logger.info("可用工具类别:")
-        categories = client.get_tool_categories()
-        for category in categories:
-            logger.info(f"\n{category.upper()}类工具:")
-            tools = client.list_available_tools(category)
-            for tool in tools:
-                logger.info(f"- {tool['name']}: {tool['description']}")
+        # 复用进程内共享的连接，多个示例依次运行时不必重新连接
+        async with BlenderMCPClient.session(
+            config.get("host", "localhost"), config.get("port", 9876)
+        ) as client:
+            logger.info("已连接到Blender服务器")
+            
+            # 列出配置中启用的工具类别
+            logger.info("已启用的工具类别:")
+            for category, settings in config.get("tools", {}).items():
+                if settings.get("enabled", True):
+                    logger.info(f"- {category}: {settings.get('parameters', {})}")
                 
-        # 创建一个使用节点材质的金属球体
-        sphere = await client.create_object(
-            type="SPHERE",
-            name="metal_sphere",
-            location=[0, 0, 0],
-            scale=[1, 1, 1]
-        )
+            # 创建一个金属球体
+            response = await client.create_object(
+                "SPHERE",
+                "metal_sphere",
+                location=[0, 0, 0],
+                scale=[1, 1, 1]
+            )
+            sphere_name = get_object_name(response, "metal_sphere")
         
-        # 使用预设的金属材质
-        await client.create_node_material(
-            name="metal_material",
-            node_setup={
-                "nodes": {
-                    "principled": {
-                        "type": "ShaderNodeBsdfPrincipled",
-                        "location": [0, 0],
-                        "properties": {
-                            "metallic": 1.0,
-                            "roughness": 0.2,
-                            "base_color": [0.8, 0.8, 0.8, 1.0]
-                        }
-                    },
-                    "output": {
-                        "type": "ShaderNodeOutputMaterial",
-                        "location": [300, 0]
-                    }
-                },
-                "links": [
-                    {
-                        "from_node": "principled",
-                        "from_socket": "BSDF",
-                        "to_node": "output",
-                        "to_socket": "Surface"
-                    }
-                ]
-            }
-        )
+            # 使用配置中的金属材质预设
+            metal = (
+                config.get("advanced_features", {}).get("node_materials", {})
+                .get("presets", {}).get("metal", {})
+                .get("nodes", {}).get("principled", {}).get("properties", {})
+            )
+            await client.send_command("create_material", {
+                "name": "metal_material",
+                "color": [0.8, 0.8, 0.8, 1.0],
+                "metallic": metal.get("metallic", 1.0),
+                "roughness": metal.get("roughness", 0.2)
+            })
+            await client.send_command("assign_material", {
+                "object_name": sphere_name,
+                "material_name": "metal_material"
+            })
         
-        # 创建三点灯光布局
-        # 主光源
-        await client.create_light(
-            type="AREA",
-            name="key_light",
-            location=[5, -5, 5],
-            energy=1000,
-            color=[1.0, 0.95, 0.8]
-        )
+            # 创建三点灯光布局：主光源、补光、背光
+            lighting = tool_parameters(config, "lighting")
+            key_energy = lighting.get("default_energy", 1000)
+            for name, location, scale, color in (
+                ("key_light", [5, -5, 5], 1.0, [1.0, 0.95, 0.8]),
+                ("fill_light", [-5, -2, 3], 0.4, [0.8, 0.87, 1.0]),
+                ("back_light", [0, 5, 3], 0.6, lighting.get("default_color", [1.0, 1.0, 1.0])),
+            ):
+                await client.send_command("create_light", {
+                    "type": "AREA",
+                    "name": name,
+                    "location": location,
+                    "energy": key_energy * scale,
+                    "color": color
+                })
         
-        # 补光
-        await client.create_light(
-            type="AREA",
-            name="fill_light",
-            location=[-5, -2, 3],
-            energy=400,
-            color=[0.8, 0.87, 1.0]
-        )
+            # 设置渲染参数
+            render = tool_parameters(config, "render")
+            await client.send_command("set_render_engine", {
+                "engine": render.get("engine", "CYCLES"),
+                "device": "GPU" if render.get("use_gpu", True) else "CPU"
+            })
+            await client.send_command("set_render_resolution", {
+                "resolution_x": render.get("resolution_x", 1920),
+                "resolution_y": render.get("resolution_y", 1080)
+            })
         
-        # 背光
-        await client.create_light(
-            type="AREA",
-            name="back_light",
-            location=[0, 5, 3],
-            energy=600,
-            color=[1.0, 1.0, 1.0]
-        )
+            # 创建一个简单的旋转动画
+            for frame, rotation in ((1, [0, 0, 0]), (120, [0, 0, 6.28319])):  # 360度
+                await client.send_command("insert_keyframe", {
+                    "object_name": sphere_name,
+                    "frame": frame,
+                    "rotation": rotation
+                })
         
-        # 添加一个细分曲面修改器
-        await client.add_modifier(
-            object_name="metal_sphere",
-            modifier_type="SUBSURF",
-            parameters={
-                "levels": 2,
-                "render_levels": 3
-            }
-        )
+            # 渲染图像
+            output_path = str(Path(__file__).parent / "render_result.png")
+            await client.send_command("render_image", {
+                "file_path": output_path,
+                "file_format": render.get("output_format", "PNG"),
+                "samples": render.get("samples", 128),
+                "resolution_x": render.get("resolution_x", 1920),
+                "resolution_y": render.get("resolution_y", 1080)
+            })
         
-        # 设置渲染参数
-        await client.set_render_settings(
-            engine="CYCLES",
-            samples=128,
-            resolution_x=1920,
-            resolution_y=1080,
-            use_gpu=True
-        )
-        
-        # 创建一个简单的旋转动画
-        await client.create_animation(
-            object_name="metal_sphere",
-            property_path="rotation_euler",
-            keyframes={
-                "1": [0, 0, 0],
-                "120": [0, 0, 6.28319]  # 360度
-            }
-        )
-        
-        # 渲染图像
-        output_path = str(Path(__file__).parent / "render_result.png")
-        await client.render_image(
-            output_path=output_path,
-            format="PNG",
-            quality=90
-        )
-        
-        logger.info(f"渲染完成，结果保存在: {output_path}")
+            logger.info(f"渲染完成，结果保存在: {output_path}")
         
     except Exception as e:
         logger.error(f"演示过程中出错: {e}")
+
+async def main():
+    """运行所有示例，结束后关闭共享连接"""
+    try:
+        await demonstrate_advanced_features(load_config())
     finally:
-        await client.disconnect()
+        await BlenderMCPClient.close_shared()
         logger.info("已断开与服务器的连接")
 
 if __name__ == "__main__":
-    asyncio.run(demonstrate_advanced_features()) 
\ No newline at end of file
+    # 如果安装了uvloop则使用更快的事件循环
+    try:
+        from uvloop import run
+    except ImportError:
+        from asyncio import run
+        # Windows上使用选择器事件循环，避免Proactor为每个连接额外分配缓冲区
+        if sys.platform == "win32":
+            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    run(main()) 
\ No newline at end of file
@@ -10,8 +10,10 @@ import sys
 import shutil
 import logging
 import subprocess
-import tempfile
 import platform
+import functools
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 配置日志
@@ -21,15 +23,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 当前操作系统（小写）
+SYSTEM = platform.system().lower()
+
+# 依赖包下载缓存目录
+WHEEL_CACHE_DIR = os.path.expanduser(os.path.join("~", ".cache", "blendermcp", "wheels"))
+
+# 插件 __init__.py 中添加依赖路径的代码
+LIB_PATH_SETUP = '''
+import os
+import sys
+
+# 添加依赖路径
+lib_path = os.path.join(os.path.dirname(__file__), "lib")
+if os.path.exists(lib_path) and lib_path not in sys.path:
+    sys.path.insert(0, lib_path)
+'''
+LIB_PATH_MARKER = "lib_path = os.path.join(os.path.dirname(__file__)"
+
+@functools.lru_cache(maxsize=1)
 def get_platform_specific_paths():
     """获取平台特定的Blender安装路径"""
-    system = platform.system().lower()
-    
-    if system == 'windows':
+    if SYSTEM == 'windows':
         return [
             os.path.expanduser("~\\AppData\\Roaming\\Blender Foundation\\Blender"),  # 用户目录
         ]
-    elif system == 'darwin':  # macOS
+    elif SYSTEM == 'darwin':  # macOS
         return [
             os.path.expanduser("~/Library/Application Support/Blender"),
         ]
@@ -38,8 +57,12 @@ def get_platform_specific_paths():
             os.path.expanduser("~/.config/blender"),
         ]
 
+@functools.lru_cache(maxsize=1)
 def get_blender_versions():
-    """获取已安装的 Blender 版本"""
+    """获取已安装的 Blender 版本
+
+    结果会被缓存，同一次运行中只扫描一次目录
+    """
     possible_paths = get_platform_specific_paths()
     versions = []
     
@@ -49,10 +72,13 @@ def get_blender_versions():
             
         try:
             # 遍历目录查找Blender版本
-            for item in os.listdir(base_path):
-                if item.replace(".", "").isdigit():  # 检查是否是版本号目录（如 "4.2"）
-                    version = item
-                    addon_path = os.path.join(base_path, version, "scripts", "addons")
+            with os.scandir(base_path) as entries:
+                for entry in entries:
+                    # 检查是否是版本号目录（如 "4.2"）
+                    if not (entry.name.replace(".", "").isdigit() and entry.is_dir()):
+                        continue
+                    version = entry.name
+                    addon_path = os.path.join(entry.path, "scripts", "addons")
                     
                     # 确保插件目录存在
                     os.makedirs(addon_path, exist_ok=True)
@@ -70,9 +96,9 @@ def get_blender_versions():
         
         for version in default_versions:
             try:
-                if platform.system().lower() == 'windows':
+                if SYSTEM == 'windows':
                     addon_path = os.path.expanduser(f"~\\AppData\\Roaming\\Blender Foundation\\Blender\\{version}\\scripts\\addons")
-                elif platform.system().lower() == 'darwin':
+                elif SYSTEM == 'darwin':
                     addon_path = os.path.expanduser(f"~/Library/Application Support/Blender/{version}/scripts/addons")
                 else:  # Linux
                     addon_path = os.path.expanduser(f"~/.config/blender/{version}/scripts/addons")
@@ -92,9 +118,15 @@ def get_addon_source_path():
     source_path = os.path.join(os.path.dirname(current_dir), "src", "blendermcp")
     return source_path
 
-def get_addon_install_path(blender_version):
-    """获取插件安装路径"""
-    versions = get_blender_versions()
+def get_addon_install_path(blender_version, versions=None):
+    """获取插件安装路径
+
+    Args:
+        blender_version: Blender 版本
+        versions: 已找到的 (版本, 插件目录) 列表，为空时调用 get_blender_versions
+    """
+    if versions is None:
+        versions = get_blender_versions()
     for version, addons_path in versions:
         if version == blender_version:
             return os.path.join(addons_path, "blendermcp")
@@ -108,10 +140,9 @@ def get_addon_install_path(blender_version):
 
 def get_blender_python_path(blender_version):
     """获取 Blender Python 路径"""
-    system = platform.system().lower()
-    if system == 'windows':
+    if SYSTEM == 'windows':
         return os.path.expanduser(f"~\\AppData\\Roaming\\Blender Foundation\\Blender\\{blender_version}\\python\\bin\\python.exe")
-    elif system == 'darwin':
+    elif SYSTEM == 'darwin':
         return f"/Applications/Blender.app/Contents/Resources/{blender_version}/python/bin/python3"
     else:  # Linux
         return f"/usr/share/blender/{blender_version}/python/bin/python3"
@@ -130,53 +161,124 @@ def get_system_python():
         except:
             return None
 
-def install_dependencies_to_temp():
-    """安装依赖到临时目录"""
-    temp_dir = tempfile.mkdtemp()
+def _clone_file(src, dst):
+    """克隆单个文件，尽量避免真正复制数据
+
+    依次尝试硬链接、内核内复制（Linux，btrfs/XFS上为reflink）、
+    APFS克隆（macOS），都不可用时回退到 shutil.copy2
+    """
     try:
-        requirements_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "requirements.txt")
-        if not os.path.exists(requirements_file):
-            logger.error("找不到 requirements.txt 文件")
-            return None
-        
-        python_exe = get_system_python()
-        if not python_exe:
-            logger.error("找不到系统 Python")
-            return None
-        
+        os.link(src, dst)
+        return dst
+    except OSError:
+        pass
+
+    if hasattr(os, 'copy_file_range'):
         try:
-            subprocess.check_call([python_exe, "-m", "pip", "install", 
-                                 "--target", temp_dir, 
-                                 "-r", requirements_file])
-            return temp_dir
-        except subprocess.CalledProcessError as e:
-            logger.error(f"安装依赖时出错: {e}")
-            return None
-    except Exception as e:
-        logger.error(f"创建临时目录时出错: {e}")
-        return None
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            pass
+    elif sys.platform == 'darwin':
+        try:
+            if subprocess.run(["cp", "-c", src, dst], capture_output=True).returncode == 0:
+                return dst
+        except OSError:
+            pass
 
-def copy_dependencies(temp_dir, install_path):
-    """复制依赖到插件目录"""
-    if not temp_dir or not os.path.exists(temp_dir):
-        logger.error("临时目录不存在")
-        return
+    return shutil.copy2(src, dst)
+
+def _clone_tree(src, dst):
+    """克隆目录树，文件通过 _clone_file 创建"""
+    return shutil.copytree(src, dst, copy_function=_clone_file)
+
+def _write_file(path, content):
+    """写入文件
+
+    安装目录中的文件可能是源文件的硬链接，先删除再写入，避免改动源文件
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+def download_dependencies(python_exe, requirements_file):
+    """下载依赖包到缓存目录
+
+    缓存中记录了 requirements.txt 的哈希，未变化时跳过下载
+
+    Returns:
+        list: 缓存中的依赖包文件路径
+    """
+    with open(requirements_file, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    stamp_file = os.path.join(WHEEL_CACHE_DIR, "requirements.sha256")
+    
+    cached = False
+    if os.path.exists(stamp_file):
+        with open(stamp_file, 'r', encoding='utf-8') as f:
+            cached = f.read().strip() == digest
+    
+    if cached:
+        logger.info("依赖包缓存有效，跳过下载")
+    else:
+        # requirements.txt 已变化，旧版本的包不能再用
+        if os.path.exists(WHEEL_CACHE_DIR):
+            shutil.rmtree(WHEEL_CACHE_DIR)
+        os.makedirs(WHEEL_CACHE_DIR)
+        subprocess.check_call([python_exe, "-m", "pip", "download",
+                               "--dest", WHEEL_CACHE_DIR,
+                               "-r", requirements_file])
+        with open(stamp_file, 'w', encoding='utf-8') as f:
+            f.write(digest)
+    
+    with os.scandir(WHEEL_CACHE_DIR) as entries:
+        return sorted(entry.path for entry in entries
+                      if entry.is_file() and entry.name != "requirements.sha256")
+
+def prepare_dependencies():
+    """准备依赖包
+
+    Returns:
+        tuple: (系统 Python 路径, 依赖包文件列表)，失败时返回 None
+    """
+    requirements_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "requirements.txt")
+    if not os.path.exists(requirements_file):
+        logger.error("找不到 requirements.txt 文件")
+        return None
+    
+    python_exe = get_system_python()
+    if not python_exe:
+        logger.error("找不到系统 Python")
+        return None
     
+    try:
+        return python_exe, download_dependencies(python_exe, requirements_file)
+    except (subprocess.CalledProcessError, OSError) as e:
+        logger.error(f"下载依赖时出错: {e}")
+        return None
+
+def install_dependencies(install_path, python_exe, packages):
+    """将依赖包直接安装到插件的 lib 目录
+
+    Blender 首次导入时会自行生成 .pyc，因此跳过编译
+    """
     try:
         # 创建 lib 目录
         lib_path = os.path.join(install_path, "lib")
         os.makedirs(lib_path, exist_ok=True)
         
-        # 复制所有依赖包到 lib 目录
-        for item in os.listdir(temp_dir):
-            item_path = os.path.join(temp_dir, item)
-            if os.path.isdir(item_path) and not item.startswith('__'):
-                target_path = os.path.join(lib_path, item)
-                if os.path.exists(target_path):
-                    shutil.rmtree(target_path)
-                shutil.copytree(item_path, target_path)
-            elif os.path.isfile(item_path) and item.endswith('.py'):
-                shutil.copy2(item_path, lib_path)
+        if packages:
+            subprocess.check_call([python_exe, "-m", "pip", "install",
+                                   "--no-compile", "--no-deps", "--no-index",
+                                   "--target", lib_path] + packages)
         
         # 创建 __init__.py
         init_file = os.path.join(lib_path, '__init__.py')
@@ -184,46 +286,28 @@ def copy_dependencies(temp_dir, install_path):
             with open(init_file, 'w') as f:
                 f.write('"""Dependencies package."""\n')
         
-        logger.info("依赖包已复制到插件目录")
+        logger.info("依赖包已安装到插件目录")
     except Exception as e:
-        logger.error(f"复制依赖时出错: {e}")
-    finally:
-        try:
-            # 清理临时目录
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-        except Exception as e:
-            logger.error(f"清理临时目录时出错: {e}")
+        logger.error(f"安装依赖时出错: {e}")
 
 def modify_addon_init(install_path):
-    """修改插件的 __init__.py 文件，添加依赖路径"""
-    init_file = os.path.join(install_path, "__init__.py")
-    if not os.path.exists(init_file):
+    """修改插件的 __init__.py 文件，添加依赖路径
+
+    文件中已有依赖路径代码时不做任何写入
+    """
+    init_file = Path(install_path) / "__init__.py"
+    try:
+        content = init_file.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return
+    
+    # 如果文件开头没有这段代码，就添加它
+    if LIB_PATH_MARKER in content:
         return
     
     try:
-        with open(init_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 添加依赖路径代码
-        path_setup = '''
-import os
-import sys
-
-# 添加依赖路径
-lib_path = os.path.join(os.path.dirname(__file__), "lib")
-if os.path.exists(lib_path) and lib_path not in sys.path:
-    sys.path.insert(0, lib_path)
-'''
-        
-        # 如果文件开头没有这段代码，就添加它
-        if "lib_path = os.path.join(os.path.dirname(__file__)" not in content:
-            content = path_setup + content
-            
-            with open(init_file, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            logger.info("已更新插件初始化文件")
+        _write_file(init_file, LIB_PATH_SETUP + content)
+        logger.info("已更新插件初始化文件")
     except Exception as e:
         logger.error(f"修改插件初始化文件时出错: {e}")
 
@@ -237,10 +321,19 @@ def uninstall_addon(blender_version):
         except Exception as e:
             logger.error(f"卸载插件时出错: {e}")
 
-def install_addon(blender_version):
-    """安装插件"""
+def install_addon(blender_version, addons_path=None, deps=None):
+    """安装插件
+
+    Args:
+        blender_version: Blender 版本
+        addons_path: 该版本的插件目录，为空时根据版本查找
+        deps: prepare_dependencies 的返回值，为空时不安装依赖
+    """
     source_path = get_addon_source_path()
-    install_path = get_addon_install_path(blender_version)
+    if addons_path:
+        install_path = os.path.join(addons_path, "blendermcp")
+    else:
+        install_path = get_addon_install_path(blender_version)
     
     # 确保源代码路径存在
     if not os.path.exists(source_path):
@@ -256,13 +349,13 @@ def install_addon(blender_version):
         os.makedirs(install_path)
         
         # 复制整个 blendermcp 包到插件目录
-        for item in os.listdir(source_path):
-            src = os.path.join(source_path, item)
-            dst = os.path.join(install_path, item)
-            if os.path.isdir(src):
-                shutil.copytree(src, dst)
-            else:
-                shutil.copy2(src, dst)
+        with os.scandir(source_path) as entries:
+            for entry in entries:
+                dst = os.path.join(install_path, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    _clone_tree(entry.path, dst)
+                else:
+                    _clone_file(entry.path, dst)
         
         # 从 addon/__init__.py 复制 bl_info 到插件根目录的 __init__.py
         addon_init = os.path.join(source_path, "addon", "__init__.py")
@@ -297,13 +390,11 @@ from .addon import register, unregister
 if __name__ == "__main__":
     register()
 '''
-                with open(root_init, 'w', encoding='utf-8') as f:
-                    f.write(init_content)
+                _write_file(root_init, init_content)
         
         # 安装依赖
-        temp_dir = install_dependencies_to_temp()
-        if temp_dir:
-            copy_dependencies(temp_dir, install_path)
+        if deps:
+            install_dependencies(install_path, *deps)
             
         # 修改插件初始化文件
         modify_addon_init(install_path)
@@ -328,13 +419,19 @@ def main():
     
     logger.info(f"找到以下 Blender 版本: {', '.join([version for version, _ in versions])}")
     
-    # 对每个版本进行操作
-    for version, _ in versions:
-        logger.info(f"将在以下版本上操作: {version}")
-        if uninstall:
+    if uninstall:
+        for version, _ in versions:
+            logger.info(f"将在以下版本上操作: {version}")
             uninstall_addon(version)
-        else:
-            install_addon(version)
+        return
+
+    # 依赖与 Blender 版本无关，只下载一次，再并行安装到各版本的插件目录
+    deps = prepare_dependencies()
+    with ThreadPoolExecutor(max_workers=len(versions)) as pool:
+        list(pool.map(
+            lambda item: install_addon(item[0], item[1], deps),
+            versions
+        ))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
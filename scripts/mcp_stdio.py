@@ -4,7 +4,9 @@
 import asyncio
 import os
 import sys
+import queue
 import logging
+import logging.handlers
 
 # 添加项目根目录到路径
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -12,12 +14,15 @@ sys.path.insert(0, project_root)
 
 from src.blendermcp.mcp import MCPServer
 
-# 配置基本日志
+# 配置基本日志，输出到文件便于调试
+# 文件写入交给后台线程，避免阻塞处理标准输入/输出的事件循环
+file_handler = logging.FileHandler('blendermcp_mcp.log', mode='a', encoding='utf-8')
+file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, file_handler)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    filename='blendermcp_mcp.log',  # 输出到文件便于调试
-    filemode='a'
+    handlers=[logging.handlers.QueueHandler(log_queue)]
 )
 
 async def main():
@@ -26,4 +31,17 @@ async def main():
     await server.start_stdio()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # 标准输出只用于协议消息，直接写出而不在Python层缓冲
+    sys.stdout.reconfigure(line_buffering=False, write_through=True)
+
+    # 如果安装了uvloop则使用更快的事件循环
+    try:
+        from uvloop import run
+    except ImportError:
+        from asyncio import run
+
+    log_listener.start()
+    try:
+        run(main())
+    finally:
+        log_listener.stop()
@@ -6,12 +6,9 @@ BlenderMCP - Blender的多模态控制协议
 
 import os
 import sys
-import bpy
 import logging
-import subprocess
-import tempfile
+import importlib
 import importlib.util
-from pathlib import Path
 
 # 插件信息
 bl_info = {
@@ -25,108 +22,154 @@ bl_info = {
     "category": "Interface"
 }
 
-# 配置日志
-log_dir = os.path.join(tempfile.gettempdir(), "blendermcp")
-os.makedirs(log_dir, exist_ok=True)
-log_file = os.path.join(log_dir, "blendermcp_addon.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
+from .common.logging_setup import setup_logging
+
 logger = logging.getLogger("blendermcp")
 
-# 设置库安装目录
+# 设置库安装目录，导入时不创建，安装依赖时才创建
 LIB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib")
-os.makedirs(LIB_DIR, exist_ok=True)
-sys.path.insert(0, LIB_DIR)
+# 追加到末尾而不是插入到最前面，其他模块的导入不必先在lib目录中查找
+if LIB_DIR not in sys.path:
+    sys.path.append(LIB_DIR)
 
 # 获取当前模块的路径和项目根目录
 ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(ADDON_DIR)))
 
+# 找不到requirements.txt时使用的基本依赖
+DEFAULT_REQUIREMENTS = "websocket-client>=1.8.0\nwebsocket-server>=0.6.1\n"
+
+# 依赖安装成功后写入的标记文件，内容为requirements的哈希
+DEPS_SENTINEL = os.path.join(LIB_DIR, ".deps_ok")
+
 # 检查并安装依赖项
 def ensure_dependencies():
     """确保所有依赖项都已安装"""
+    # 只在注册插件时用到，不在导入本模块时加载
+    import hashlib
+    
+    # 查找requirements.txt
+    requirements_file = os.path.join(ROOT_DIR, "requirements.txt")
+    if os.path.exists(requirements_file):
+        with open(requirements_file, 'rb') as f:
+            requirements = f.read()
+    else:
+        requirements_file = None
+        requirements = DEFAULT_REQUIREMENTS.encode('utf-8')
+    req_hash = hashlib.sha256(requirements).hexdigest()
+    
+    # 之前已经按相同的requirements安装过，直接跳过检查
     try:
-        # 尝试导入关键依赖
-        import websocket
+        with open(DEPS_SENTINEL, 'r', encoding='utf-8') as f:
+            if f.read().strip() == req_hash:
+                return
+    except OSError:
+        pass
+    
+    # 只查找模块规格而不导入，避免在注册插件时执行websocket包的初始化代码
+    if importlib.util.find_spec("websocket") is not None:
         logger.info("websocket-client已安装")
-    except ImportError:
-        logger.warning("websocket-client未安装，正在尝试安装...")
-        try:
-            # 查找requirements.txt
-            requirements_file = os.path.join(ROOT_DIR, "requirements.txt")
-            if not os.path.exists(requirements_file):
-                logger.warning(f"无法找到requirements.txt: {requirements_file}")
-                # 创建一个基本的requirements.txt
-                requirements_file = os.path.join(tempfile.gettempdir(), "blendermcp_requirements.txt")
-                with open(requirements_file, 'w') as f:
-                    f.write("websocket-client>=1.8.0\nwebsocket-server>=0.6.1\n")
-            
-            # 使用pip安装依赖
-            python_exe = sys.executable
-            cmd = [
-                python_exe, "-m", "pip", "install",
-                "--target", LIB_DIR,
-                "-r", requirements_file
-            ]
+        return
+    
+    logger.warning("websocket-client未安装，正在尝试安装...")
+    import subprocess
+    import tempfile
+    try:
+        if requirements_file is None:
+            logger.warning(f"无法找到requirements.txt: {os.path.join(ROOT_DIR, 'requirements.txt')}")
+            # 创建一个基本的requirements.txt
+            requirements_file = os.path.join(tempfile.gettempdir(), "blendermcp_requirements.txt")
+            with open(requirements_file, 'w') as f:
+                f.write(DEFAULT_REQUIREMENTS)
+        
+        # 使用pip安装依赖
+        os.makedirs(LIB_DIR, exist_ok=True)
+        python_exe = sys.executable
+        cmd = [
+            python_exe, "-m", "pip", "install",
+            "--target", LIB_DIR,
+            "-r", requirements_file
+        ]
+        
+        logger.info(f"执行命令: {' '.join(cmd)}")
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        
+        if result.returncode != 0:
+            logger.error(f"安装依赖失败: {result.stderr}")
+            # 尝试单独安装关键依赖
+            try:
+                subprocess.run(
+                    [python_exe, "-m", "pip", "install", "--target", LIB_DIR, "websocket-client>=1.8.0"],
+                    check=True
+                )
+                logger.info("已安装websocket-client")
+            except Exception as e:
+                logger.error(f"安装websocket-client失败: {e}")
+        else:
+            logger.info("依赖项安装成功")
+            # 记录本次安装所用的requirements，下次启动时跳过
+            with open(DEPS_SENTINEL, 'w', encoding='utf-8') as f:
+                f.write(req_hash)
             
-            logger.info(f"执行命令: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+        # 重新加入路径并重新导入
+        if LIB_DIR not in sys.path:
+            sys.path.append(LIB_DIR)
             
-            if result.returncode != 0:
-                logger.error(f"安装依赖失败: {result.stderr}")
-                # 尝试单独安装关键依赖
-                try:
-                    subprocess.run(
-                        [python_exe, "-m", "pip", "install", "--target", LIB_DIR, "websocket-client>=1.8.0"],
-                        check=True
-                    )
-                    logger.info("已安装websocket-client")
-                except Exception as e:
-                    logger.error(f"安装websocket-client失败: {e}")
-            else:
-                logger.info("依赖项安装成功")
-                
-            # 重新加入路径并重新导入
-            if LIB_DIR not in sys.path:
-                sys.path.insert(0, LIB_DIR)
-                
-        except Exception as e:
-            logger.error(f"安装依赖项时出错: {e}")
-
-# 从addon子模块导入
-try:
-    from .addon import (
-        panels,
-        preferences, 
-        properties,
-        server_operators,
-        tool_viewer,
-        request_listener
-    )
-    # 标记模块是否已导入
-    HAS_ADDON_MODULES = True
-except ImportError as e:
-    logger.error(f"导入addon子模块失败: {e}")
-    HAS_ADDON_MODULES = False
+    except Exception as e:
+        logger.error(f"安装依赖项时出错: {e}")
+
+# addon子模块依赖bpy且导入开销较大，在首次访问时才导入（PEP 562）
+_LAZY_SUBMODULES = {
+    "panels": ".addon.panels",
+    "preferences": ".addon.preferences",
+    "properties": ".addon.properties",
+    "server_operators": ".addon.server_operators",
+    "tool_viewer": ".addon.tool_viewer",
+    "request_listener": ".addon.request_listener",
+}
+
+def __getattr__(name):
+    """按需导入addon子模块"""
+    if name not in _LAZY_SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_LAZY_SUBMODULES[name], __name__)
+    globals()[name] = module
+    return module
+
+def _load_addon_modules():
+    """导入所有addon子模块，之后可以在本模块中直接使用模块名
+
+    Returns:
+        bool: 是否全部导入成功
+    """
+    try:
+        for name in _LAZY_SUBMODULES:
+            __getattr__(name)
+        return True
+    except ImportError as e:
+        logger.error(f"导入addon子模块失败: {e}")
+        return False
 
 
 # 注册函数
 def register():
     """注册插件"""
+    import bpy
+    # 导入插件时不配置日志，只在注册时配置
+    setup_logging()
     logger.info("注册BlenderMCP插件...")
     
     # 确保依赖项已安装
     ensure_dependencies()
     
     # 注册各个模块
-    if HAS_ADDON_MODULES:
+    if _load_addon_modules():
         preferences.register()
+        # 应用保存的日志级别
+        try:
+            preferences.apply_log_level(preferences.get_addon_preferences(bpy.context).log_level)
+        except (KeyError, AttributeError):
+            pass
         properties.register()
         panels.register()
         server_operators.register()
@@ -140,14 +183,15 @@ def register():
 # 注销函数
 def unregister():
     """注销插件"""
+    import bpy
     logger.info("注销BlenderMCP插件...")
     
-    # 停止服务器
-    if HAS_ADDON_MODULES:
+    # 停止服务器，只发送终止信号，不在注销时等待进程退出
+    if _load_addon_modules():
         try:
             if request_listener.is_running():
                 request_listener.stop()
-            server_operators.stop_server()
+            server_operators.stop_server(wait=False)
         except Exception as e:
             logger.error(f"停止服务器时出错: {e}")
         
@@ -172,8 +216,9 @@ def unregister():
 # 延迟启动服务器的函数
 def start_server_delayed():
     """延迟启动服务器，确保在Blender完全加载后启动"""
+    import bpy
     try:
-        # 获取偏好设置
+        # 获取偏好设置，只查找一次
         addon_prefs = preferences.get_addon_preferences(bpy.context)
         
         # 检查是否自动启动服务器
@@ -181,7 +226,8 @@ def start_server_delayed():
             logger.info("自动启动MCP服务器...")
             
             # 启动服务器
-            if addon_prefs.server_mode == 'WEBSOCKET':
+            mode = addon_prefs.server_mode
+            if mode == 'WEBSOCKET':
                 host = addon_prefs.websocket_host
                 port = addon_prefs.websocket_port
                 success, message = server_operators.start_server(host=host, port=port, debug=True)
@@ -202,10 +248,15 @@ def start_server_delayed():
                 logger.error(f"MCP服务器自动启动失败: {message}")
                 
                 # 添加一个按钮到界面，允许用户查看日志
-                if hasattr(bpy.ops, 'blendermcp') and hasattr(bpy.ops.blendermcp, 'view_server_log'):
+                blendermcp_ops = getattr(bpy.ops, 'blendermcp', None)
+                if blendermcp_ops is not None and hasattr(blendermcp_ops, 'view_server_log'):
                     logger.info("用户可以通过'查看服务器日志'按钮查看详细错误信息")
     except Exception as e:
-        logger.error(f"延迟启动服务器时出错: {e}", exc_info=True)
+        # 完整的调用栈只在调试时记录，遍历Blender的调用栈开销不小
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.error("延迟启动服务器时出错: %s", e, exc_info=True)
+        else:
+            logger.error("延迟启动服务器时出错: %s", e)
     
     return None  # 不再重复调用
 
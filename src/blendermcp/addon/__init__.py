@@ -14,9 +14,8 @@ bl_info = {
     "category": "AI"
 }
 
-# 阻止asyncio导入，避免与Blender内置Python版本的兼容性问题
-import sys
-sys.modules['asyncio'] = None
+# 插件代码在Blender中只使用线程和IPC队列，不依赖asyncio。
+# 不要通过sys.modules屏蔽asyncio，那会影响同一Blender进程中的其他插件。
 
 # 尝试导入bpy模块
 try:
@@ -25,9 +24,8 @@ try:
 except ImportError:
     HAS_BPY = False
 
-import os
 import logging
-import tempfile
+from ..common.logging_setup import setup_logging
 from . import preferences
 from . import server_operators
 if HAS_BPY:
@@ -35,35 +33,39 @@ if HAS_BPY:
     from . import tool_viewer
 from . import executor  # 确保导入执行器
 
-# 配置日志
-log_file = os.path.join(tempfile.gettempdir(), "blendermcp_addon.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("BlenderMCP.Addon")
 
+# 所有需要注册的Blender类，按注册顺序排列，注销时逆序
+# 首选项、服务器操作符和面板由各自模块的register()注册，它们还负责模块级的缓存、
+# 处理器和重复注册检查
+_ALL_CLASSES = (
+    *tool_viewer.classes,
+) if HAS_BPY else ()
+
+if HAS_BPY:
+    _register_classes, _unregister_classes = bpy.utils.register_classes_factory(_ALL_CLASSES)
+
 # 注册和注销函数
 def register():
     """注册所有addon模块"""
+    # 导入插件时不配置日志，只在注册时配置
+    setup_logging()
     logger.info("注册BlenderMCP addon模块")
     
-    # 注册首选项
-    preferences.register()
-    
-    # 注册服务器操作符
-    server_operators.register()
-    
     if HAS_BPY:
-        # 注册面板
+        # 先注册首选项，后面的自动启动需要读取它
+        preferences.register()
+        server_operators.register()
         panels.register()
-        
         # 注册工具查看器
-        tool_viewer.register()
+        _register_classes()
+        tool_viewer.register_properties()
+        
+        # 应用保存的日志级别
+        try:
+            preferences.apply_log_level(preferences.get_addon_preferences(bpy.context).log_level)
+        except (KeyError, AttributeError):
+            pass
         
         # 初始化执行器
         executor.initialize()
@@ -76,11 +78,12 @@ def register():
                 mode = addon_prefs.server_mode
                 
                 if mode == 'WEBSOCKET':
-                    host = addon_prefs.websocket_host
-                    port = addon_prefs.websocket_port
-                    server_operators.start_server(mode, host, port)
+                    server_operators.start_server(
+                        host=addon_prefs.websocket_host,
+                        port=addon_prefs.websocket_port
+                    )
                 else:
-                    server_operators.start_server(mode)
+                    server_operators.start_server(host='localhost', port=0)
         except Exception as e:
             logger.error(f"自动启动MCP服务器失败: {str(e)}")
 
@@ -92,23 +95,17 @@ def unregister():
     """注销所有addon模块"""
     logger.info("注销BlenderMCP addon模块")
     
-    # 停止服务器
+    # 停止服务器，只发送终止信号，不在注销时等待进程退出
     if server_operators.is_server_running():
         logger.info("停止MCP服务器")
-        server_operators.stop_server()
+        server_operators.stop_server(wait=False)
     
     if HAS_BPY:
-        # 注销工具查看器
-        tool_viewer.unregister()
-        
-        # 注销面板
+        tool_viewer.unregister_properties()
+        _unregister_classes()
         panels.unregister()
-    
-    # 注销服务器操作符
-    server_operators.unregister()
-    
-    # 注销首选项
-    preferences.unregister()
+        server_operators.unregister()
+        preferences.unregister()
 
     # 停止请求监听器
     from . import request_listener
@@ -7,9 +7,6 @@ BlenderMCP插件全局变量
 # BlenderMCP版本
 VERSION = "0.3.0"
 
-# MCP服务器进程
-mcp_server_process = None
-
 # 全局设置
 settings = {
     "debug_mode": False,
@@ -45,8 +45,29 @@ from . import preferences
 from . import server_operators
 from . import tool_viewer
 
+# 服务器状态中按需显示的字段及其标题
+_STATUS_FIELDS = (
+    ("uptime", "运行时间"),
+    ("connections", "活动连接"),
+    ("requests", "处理请求"),
+    ("pid", "进程ID"),
+)
+
+# 日志级别对应的图标
+_LEVEL_ICON = {
+    'INFO': 'INFO',
+    'WARNING': 'ERROR',
+    'ERROR': 'CANCEL',
+}
+
 # 只在bpy可用时定义面板类
 if HAS_BPY:
+    class MCP_UL_LogList(bpy.types.UIList):
+        """命令日志列表，由Blender负责滚动，只绘制可见的行"""
+        
+        def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
+            layout.label(text=item.message, icon=_LEVEL_ICON.get(item.level, 'NONE'))
+    
     class MCP_PT_Panel(Panel):
         """MCP面板"""
         bl_label = "MCP"
@@ -58,8 +79,10 @@ if HAS_BPY:
         def draw(self, context):
             layout = self.layout
             
-            # 获取服务器状态
-            is_running = server_operators.is_server_running()
+            # 读取缓存的服务器状态，状态变化时才会更新
+            status = server_operators.get_cached_server_status()
+            is_running = status["is_running"]
+            mode = status["mode"]
             
             # 状态显示
             status_box = layout.box()
@@ -76,49 +99,15 @@ if HAS_BPY:
                 # 启动服务器按钮
                 status_box.operator("blendermcp.start_server", icon='PLAY')
             
-            # 日志操作
-            log_box = layout.box()
-            log_box.label(text="服务器日志")
-            log_row = log_box.row()
-            log_row.operator("blendermcp.view_server_log", icon='TEXT')
-            log_row.operator("blendermcp.copy_server_log", icon='COPYDOWN')
-            
-            # 服务器详细信息
+            # 服务器详细信息，每项一个标签
             if is_running:
-                # 服务器模式
-                mode_row = status_box.row()
-                mode_row.label(text="模式:")
-                mode_row.label(text=server_operators.get_server_mode().upper())
-                
-                # 服务器地址
-                if server_operators.get_server_mode() == "websocket":
-                    url_row = status_box.row()
-                    url_row.label(text="WebSocket URL:")
-                    url_row.label(text=f"ws://{server_operators.get_server_host()}:{server_operators.get_server_port()}")
-                
-                # 运行时间
-                if "uptime" in server_operators.get_server_status():
-                    uptime_row = status_box.row()
-                    uptime_row.label(text="运行时间:")
-                    uptime_row.label(text=server_operators.get_server_status()["uptime"])
-                
-                # 连接数
-                if "connections" in server_operators.get_server_status():
-                    conn_row = status_box.row()
-                    conn_row.label(text="活动连接:")
-                    conn_row.label(text=str(server_operators.get_server_status()["connections"]))
-                
-                # 请求数
-                if "requests" in server_operators.get_server_status():
-                    req_row = status_box.row()
-                    req_row.label(text="处理请求:")
-                    req_row.label(text=str(server_operators.get_server_status()["requests"]))
-                
-                # 进程ID
-                if "pid" in server_operators.get_server_status():
-                    pid_row = status_box.row()
-                    pid_row.label(text="进程ID:")
-                    pid_row.label(text=str(server_operators.get_server_status()["pid"]))
+                col = status_box.column(align=True)
+                col.label(text=f"模式: {mode.upper()}")
+                if mode == "websocket":
+                    col.label(text=f"WebSocket URL: ws://{status['host']}:{status['port']}")
+                for key, title in _STATUS_FIELDS:
+                    if key in status:
+                        col.label(text=f"{title}: {status[key]}")
             
             # 服务器控制按钮
             control_box = layout.box()
@@ -131,7 +120,7 @@ if HAS_BPY:
                 row.operator("blendermcp.stop_server", text="停止服务器", icon='PAUSE')
             
             # WebSocket URL复制按钮
-            if is_running and server_operators.get_server_mode() == "websocket":
+            if is_running and mode == "websocket":
                 url_row = control_box.row()
                 url_row.operator("blendermcp.copy_websocket_url", text="复制WebSocket URL", icon='COPYDOWN')
             
@@ -161,18 +150,29 @@ if HAS_BPY:
             auto_row = config_box.row()
             auto_row.prop(addon_prefs, "auto_start_server")
             
-            # 日志查看器
+            # 服务器日志
             log_box = layout.box()
-            log_box.label(text="日志")
+            log_box.label(text="服务器日志")
+            
+            # 命令日志
+            mcp_props = getattr(context.scene, "blendermcp", None)
+            if mcp_props is not None:
+                log_box.prop(mcp_props, "show_logs")
+            if mcp_props is not None and mcp_props.show_logs and len(mcp_props.logs):
+                log_box.template_list(
+                    "MCP_UL_LogList", "",
+                    mcp_props, "logs",
+                    mcp_props, "active_log_index",
+                    rows=8
+                )
             
-            # 日志文件路径
-            log_path = os.path.join(tempfile.gettempdir(), "blendermcp_addon.log")
-            if os.path.exists(log_path):
-                log_row = log_box.row()
-                log_row.operator("blendermcp.view_server_log", text="查看日志文件", icon='TEXT')
+            log_row = log_box.row()
+            log_row.operator("blendermcp.view_server_log", icon='TEXT')
+            log_row.operator("blendermcp.copy_server_log", icon='COPYDOWN')
             
             # 工具管理 - 确保使用存在的操作符，如果新版不支持这些功能，则不显示
-            if hasattr(bpy.ops, "blendermcp") and hasattr(bpy.ops.blendermcp, "start_server"):
+            # 直接检查操作类的注册状态，不必每次重绘都经由bpy.ops查找操作符
+            if server_operators.BLENDERMCP_OT_StartServer.is_registered:
                 tools_box = layout.box()
                 tools_box.label(text="插件状态")
                 
@@ -186,12 +186,25 @@ if HAS_BPY:
 
 
 # 注册和注销
-def register():
-    """注册面板"""
-    if HAS_BPY:
-        bpy.utils.register_class(MCP_PT_Panel)
+classes = (MCP_UL_LogList, MCP_PT_Panel) if HAS_BPY else ()
 
-def unregister():
-    """注销面板"""
-    if HAS_BPY:
-        bpy.utils.unregister_class(MCP_PT_Panel) 
\ No newline at end of file
+if HAS_BPY:
+    # 由Blender生成的注册和注销函数，注销时逆序
+    _register_classes, unregister = bpy.utils.register_classes_factory(classes)
+    
+    def register():
+        """注册面板
+        
+        插件有顶层包和addon包两个注册入口，面板已由另一个入口注册时跳过，
+        避免重复注册同一个bl_idname。
+        """
+        if not MCP_PT_Panel.is_registered:
+            _register_classes()
+else:
+    def register():
+        """注册面板"""
+        pass
+    
+    def unregister():
+        """注销面板"""
+        pass 
\ No newline at end of file
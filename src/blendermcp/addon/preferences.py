@@ -5,6 +5,14 @@ BlenderMCP首选项模块
 """
 
 import os
+import logging
+
+from ..common.logging_setup import LOGGER_NAMES
+
+def apply_log_level(level):
+    """把日志级别应用到插件的日志记录器"""
+    for name in LOGGER_NAMES:
+        logging.getLogger(name).setLevel(level)
 
 # 尝试导入bpy模块
 try:
@@ -21,6 +29,10 @@ except ImportError:
 
 # 只在bpy可用时定义首选项类
 if HAS_BPY:
+    def _update_log_level(self, context):
+        """修改日志级别后立即生效"""
+        apply_log_level(self.log_level)
+    
     class MCPAddonPreferences(AddonPreferences):
         """MCP插件首选项"""
         bl_idname = "blendermcp"
@@ -68,7 +80,8 @@ if HAS_BPY:
                 ('WARNING', "警告", "仅记录警告和错误"),
                 ('ERROR', "错误", "仅记录错误")
             ],
-            default='INFO'
+            default='INFO',
+            update=_update_log_level
         )
         
         # 性能设置
@@ -186,20 +199,46 @@ if HAS_BPY:
                 row = tools_box.row()
                 row.prop(self, "enable_all_tools")
 
-    def get_addon_preferences(context):
-        """获取插件首选项"""
-        return context.preferences.addons["blendermcp"].preferences
-    
+    # 缓存的首选项对象，面板绘制和请求处理时频繁读取，避免每次都按名称查找插件
+    _PREFS_CACHE = None
+
+    def get_addon_preferences(context=None):
+        """获取插件首选项
+
+        第一次调用时查找并缓存，注册、注销和加载新文件时清空缓存。
+        """
+        global _PREFS_CACHE
+        if _PREFS_CACHE is None:
+            if context is None:
+                context = bpy.context
+            _PREFS_CACHE = context.preferences.addons["blendermcp"].preferences
+        return _PREFS_CACHE
+
+    @bpy.app.handlers.persistent
+    def _invalidate_prefs_cache(*args):
+        """清空首选项缓存，缓存的对象在重新注册或加载文件后可能失效"""
+        global _PREFS_CACHE
+        _PREFS_CACHE = None
+
     # 注册和注销
+    classes = (MCPAddonPreferences,)
+
+    # 由Blender生成的注册和注销函数
+    _register_classes, _unregister_classes = bpy.utils.register_classes_factory(classes)
+
     def register():
-        """注册首选项"""
-        if HAS_BPY:
-            bpy.utils.register_class(MCPAddonPreferences)
+        """注册首选项类"""
+        _invalidate_prefs_cache()
+        _register_classes()
+        if _invalidate_prefs_cache not in bpy.app.handlers.load_post:
+            bpy.app.handlers.load_post.append(_invalidate_prefs_cache)
 
     def unregister():
-        """注销首选项"""
-        if HAS_BPY:
-            bpy.utils.unregister_class(MCPAddonPreferences)
+        """注销首选项类"""
+        if _invalidate_prefs_cache in bpy.app.handlers.load_post:
+            bpy.app.handlers.load_post.remove(_invalidate_prefs_cache)
+        _invalidate_prefs_cache()
+        _unregister_classes()
 else:
     # 在没有bpy时提供模拟实现
     class MCPAddonPreferences:
@@ -220,6 +259,8 @@ else:
         """获取模拟的插件首选项"""
         return MCPAddonPreferences()
     
+    classes = ()
+    
     def register():
         """模拟注册函数"""
         pass
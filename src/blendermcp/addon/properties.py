@@ -4,6 +4,8 @@ BlenderMCP属性模块
 此模块实现了BlenderMCP插件的属性组。
 """
 
+import collections
+
 try:
     import bpy
     from bpy.types import PropertyGroup
@@ -11,7 +13,8 @@ try:
         StringProperty,
         BoolProperty,
         CollectionProperty,
-        EnumProperty
+        EnumProperty,
+        IntProperty
     )
     HAS_BPY = True
 except ImportError:
@@ -26,7 +29,7 @@ except ImportError:
     def StringProperty(name="", description="", default=""):
         return ""
     
-    def BoolProperty(name="", description="", default=True):
+    def BoolProperty(name="", description="", default=True, update=None):
         return False
     
     def CollectionProperty(name="", description="", type=None):
@@ -34,6 +37,60 @@ except ImportError:
     
     def EnumProperty(name="", description="", items=None, default=None):
         return default if default else (items[0][0] if items and len(items) > 0 else "")
+    
+    def IntProperty(name="", description="", default=0):
+        return default
+
+# 完整的日志记录保存在Python的deque中，保留的最大条数
+LOG_MAX_ENTRIES = 1000
+
+# 场景的日志列表只是面板显示用的视图，保留最近的这么多条
+LOG_VIEW_ENTRIES = 100
+
+# 新日志先放入队列，由定时器每隔一段时间批量写入场景的日志列表，
+# 避免每条日志都单独修改一次RNA集合
+LOG_FLUSH_INTERVAL = 0.25
+_log_history = collections.deque(maxlen=LOG_MAX_ENTRIES)
+_pending_logs = collections.deque(maxlen=LOG_VIEW_ENTRIES)
+
+def push_log(message: str, level: str = 'INFO'):
+    """添加一条日志，稍后批量写入当前场景的日志列表，需在主线程中调用"""
+    _log_history.append((message, level))
+    _pending_logs.append((message, level))
+    if HAS_BPY and not bpy.app.timers.is_registered(_flush_logs):
+        bpy.app.timers.register(_flush_logs, first_interval=LOG_FLUSH_INTERVAL)
+
+def get_logs():
+    """获取完整的日志记录
+
+    Returns:
+        list: (消息, 级别)元组的列表，按时间顺序排列
+    """
+    return list(_log_history)
+
+def _write_log_entries(logs, entries):
+    """把日志追加到场景的日志列表，只保留最近的LOG_VIEW_ENTRIES条"""
+    for message, level in entries:
+        entry = logs.add()
+        entry.message = message
+        entry.level = level
+    for _ in range(len(logs) - LOG_VIEW_ENTRIES):
+        logs.remove(0)
+
+def _flush_logs():
+    """把队列中的日志写入当前场景的日志列表，面板不显示日志时不写入"""
+    mcp_props = getattr(bpy.context.scene, "blendermcp", None)
+    if mcp_props is not None and mcp_props.show_logs:
+        _write_log_entries(mcp_props.logs, _pending_logs)
+    _pending_logs.clear()
+    return None
+
+def _update_show_logs(self, context):
+    """切换日志显示时重建或清空场景的日志列表"""
+    _pending_logs.clear()
+    self.logs.clear()
+    if self.show_logs:
+        _write_log_entries(self.logs, list(_log_history)[-LOG_VIEW_ENTRIES:])
 
 class BlenderMCPLogEntry(PropertyGroup):
     """Log entry property group"""
@@ -81,14 +138,27 @@ class BlenderMCPProperties(PropertyGroup):
         type=BlenderMCPLogEntry
     )
     
+    show_logs: BoolProperty(
+        name="Show Logs",
+        description="Show the most recent log entries in the panel",
+        default=True,
+        update=_update_show_logs
+    )
+    
+    active_log_index: IntProperty(
+        name="Active Log Index",
+        description="Index of the selected log entry",
+        default=0
+    )
+    
     def add_log(self, message: str, level: str = 'INFO'):
-        """Add a log entry"""
-        entry = self.logs.add()
-        entry.message = message
-        entry.level = level
+        """Add a log entry (written to the list in batches by push_log)"""
+        push_log(message, level)
         
     def clear_logs(self):
         """Clear all logs"""
+        _log_history.clear()
+        _pending_logs.clear()
         self.logs.clear()
 
 # 要注册的类
@@ -97,20 +167,28 @@ classes = (
     BlenderMCPProperties,
 )
 
+if HAS_BPY:
+    _register_classes, _unregister_classes = bpy.utils.register_classes_factory(classes)
+
 def register():
-    """注册属性"""
+    """注册属性
+    
+    重复启用插件或重新加载脚本时，已注册的类和场景属性不再重复注册。
+    """
     if HAS_BPY:
-        bpy.utils.register_class(BlenderMCPLogEntry)
-        bpy.utils.register_class(BlenderMCPProperties)
+        if not BlenderMCPProperties.is_registered:
+            _register_classes()
         
         # 添加到Scene
-        bpy.types.Scene.blendermcp = bpy.props.PointerProperty(type=BlenderMCPProperties)
+        if not hasattr(bpy.types.Scene, "blendermcp"):
+            bpy.types.Scene.blendermcp = bpy.props.PointerProperty(type=BlenderMCPProperties)
 
 def unregister():
     """注销属性"""
     if HAS_BPY:
         # 删除从Scene
-        del bpy.types.Scene.blendermcp
+        if hasattr(bpy.types.Scene, "blendermcp"):
+            del bpy.types.Scene.blendermcp
         
-        bpy.utils.unregister_class(BlenderMCPProperties)
-        bpy.utils.unregister_class(BlenderMCPLogEntry) 
\ No newline at end of file
+        if BlenderMCPProperties.is_registered:
+            _unregister_classes() 
\ No newline at end of file
@@ -6,19 +6,26 @@ Blender中处理外部请求的监听器组件。
 """
 
 import bpy
-import time
+import random
 import threading
 import json
+import queue
+import concurrent.futures
 import traceback
 import logging
 import os
 import sys
-import subprocess
-from pathlib import Path
 from . import globals
-from . import executor
 from . import preferences as prefs
-from ..common import ipc
+
+# WebSocket边界上优先使用orjson编解码，未安装时回退到标准库json
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
 
 # 日志配置
 logger = logging.getLogger(__name__)
@@ -26,60 +33,41 @@ logger = logging.getLogger(__name__)
 # 全局变量
 _websocket_client = None
 _processor_thread = None
-_running = False
+_client_thread = None
+# stop()时设置，通知处理线程退出，并立即唤醒等待重连的WebSocket线程
+_stop_event = threading.Event()
 
-# 初始化IPC队列
-ipc.init_queues()
+# WebSocket重连的最长等待时间(秒)
+RECONNECT_MAX_DELAY = 30.0
 
-def _find_python_executable():
-    """查找可用的Python解释器路径"""
-    # 首先尝试使用系统默认的Python
-    if sys.executable and not sys.executable.endswith('blender.exe') and not sys.executable.endswith('blender'):
-        return sys.executable
-    
-    # 在Windows上尝试查找Python
-    if os.name == 'nt':
-        for version in ['3.10', '3.9', '3.8', '3.7', '3']:
-            try:
-                # 从注册表中查找Python安装路径
-                import winreg
-                key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, f"SOFTWARE\\Python\\PythonCore\\{version}\\InstallPath")
-                value, _ = winreg.QueryValueEx(key, "")
-                python_path = os.path.join(value, "python.exe")
-                if os.path.exists(python_path):
-                    return python_path
-            except:
-                pass
-            
-            # 尝试常见安装路径
-            paths = [
-                f"C:\\Python{version.replace('.', '')}\\python.exe",
-                f"C:\\Program Files\\Python{version.replace('.', '')}\\python.exe",
-                f"C:\\Program Files (x86)\\Python{version.replace('.', '')}\\python.exe"
-            ]
-            for path in paths:
-                if os.path.exists(path):
-                    return path
-    
-    # Unix/Linux/Mac上尝试查找Python
-    else:
-        for cmd in ['python3', 'python']:
-            try:
-                path = subprocess.check_output(['which', cmd], text=True).strip()
-                if path and os.path.exists(path):
-                    return path
-            except:
-                pass
-    
-    return None
+# WebSocket控制帧ping的发送间隔和等待pong的超时时间(秒)
+WEBSOCKET_PING_INTERVAL = 20
+WEBSOCKET_PING_TIMEOUT = 5
+
+# WebSocket线程解析出的请求直接以字典形式交给处理线程，
+# 同一进程内不再经过multiprocessing队列的序列化
+_pending_calls: "queue.Queue[tuple[dict, concurrent.futures.Future]]" = queue.Queue()
+
+# 注册消息在进程内不会变化，只编码一次
+_REGISTER_FRAME = _dumps({'type': 'register', 'role': 'blender', 'version': globals.VERSION})
+
+# 处理线程一次最多取出的积压请求数，这些请求的响应一次写入套接字
+RESPONSE_BATCH_SIZE = 64
+
+# 等待发送的响应，按连接分组，只由处理线程读写
+_outgoing_responses = {}
 
 def start():
     """启动请求监听器和WebSocket客户端"""
-    global _running, _processor_thread, _websocket_client
+    global _processor_thread, _client_thread, _websocket_client
     
-    if _running:
+    if is_running():
         logger.info("BlenderMCP监听器已经在运行中")
         return
+    
+    if _processor_thread is not None:
+        # 上次启动的处理线程已意外退出，先清理残留的连接和服务器进程
+        stop()
 
     try:
         # 获取WebSocket连接地址和端口
@@ -92,37 +80,46 @@ def start():
         success, message = server_operators.start_server(host=ws_host, port=ws_port, debug=True)
         
         if not success:
-            logger.error(f"启动MCP服务器失败: {message}")
+            logger.error("启动MCP服务器失败: %s", message)
             return False
             
-        logger.info(f"MCP服务器启动成功: {message}")
+        logger.info("MCP服务器启动成功: %s", message)
     
         # 启动请求处理线程
-        _running = True
-        _processor_thread = threading.Thread(target=_process_requests, daemon=True)
+        _stop_event.clear()
+        _processor_thread = threading.Thread(
+            target=_process_requests, name="blendermcp-processor", daemon=True
+        )
         _processor_thread.start()
         
-        # 启动WebSocket客户端
-        client_thread = threading.Thread(target=_start_websocket_client, args=(ws_host, ws_port), daemon=True)
-        client_thread.start()
+        # 启动WebSocket客户端，重连也在这个线程中进行，不会再创建新线程
+        _client_thread = threading.Thread(
+            target=_start_websocket_client, args=(ws_host, ws_port),
+            name="blendermcp-websocket", daemon=True
+        )
+        _client_thread.start()
         
         logger.info("BlenderMCP监听器已启动")
         return True
         
     except Exception as e:
-        _running = False
-        logger.error(f"启动BlenderMCP监听器时出错: {e}")
-        traceback.print_exc()
+        _stop_event.set()
+        logger.exception("启动BlenderMCP监听器时出错: %s", e)
         return False
 
 def stop():
     """停止请求监听器和WebSocket客户端"""
-    global _running, _websocket_client
+    global _websocket_client, _processor_thread, _client_thread
     
-    if not _running:
+    if _processor_thread is None:
         return
     
-    _running = False
+    _stop_event.set()
+    
+    # 等待处理线程结束，正在执行的请求完成后才关闭连接
+    if _processor_thread is not None:
+        _processor_thread.join(timeout=5.0)
+        _processor_thread = None
     
     # 关闭WebSocket连接
     if _websocket_client:
@@ -132,72 +129,98 @@ def stop():
         except:
             pass
     
-    # 终止MCP服务器进程
-    if globals.mcp_server_process:
-        try:
-            globals.mcp_server_process.terminate()
-            globals.mcp_server_process = None
-        except:
-            pass
+    # 等待WebSocket线程退出，避免紧接着的start()与旧线程同时运行
+    if _client_thread is not None:
+        _client_thread.join(timeout=5.0)
+        _client_thread = None
+    
+    # 终止start()中启动的MCP服务器进程，进程只由server_operators持有，
+    # 进程退出由定时器检查，不阻塞调用方
+    from . import server_operators
+    server_operators.stop_server(wait=False)
     
     logger.info("BlenderMCP监听器已停止")
 
 def _process_requests():
     """从请求队列中处理请求"""
-    global _running
+    # 工具模块在处理线程启动时才加载，不拖慢插件启用
+    from . import executor
     
-    while _running:
+    while not _stop_event.is_set():
         try:
-            # 从队列中获取请求
-            if not ipc.REQUEST_QUEUE.empty():
-                request = ipc.REQUEST_QUEUE.get(block=False)
-                if request:
-                    # 处理请求
-                    try:
-                        result = executor.process_request(request)
-                        # 将结果放入响应队列
-                        if 'id' in request:
-                            response = {
-                                'id': request['id'],
-                                'result': result,
-                                'error': None
-                            }
-                            ipc.RESPONSE_QUEUE.put(response)
-                    except Exception as e:
-                        # 处理请求时出错
-                        if 'id' in request:
-                            response = {
-                                'id': request['id'],
-                                'result': None,
-                                'error': {
-                                    'message': str(e),
-                                    'traceback': traceback.format_exc()
-                                }
-                            }
-                            ipc.RESPONSE_QUEUE.put(response)
-                        logger.error(f"处理请求时出错: {e}")
-                        traceback.print_exc()
-            
-            # 休眠一小段时间，避免CPU占用过高
-            time.sleep(0.01)
-            
+            calls = [_pending_calls.get(timeout=0.5)]
+        except queue.Empty:
+            continue
+        # 顺带取出已经积压的请求，处理完后统一发送响应
+        while len(calls) < RESPONSE_BATCH_SIZE:
+            try:
+                calls.append(_pending_calls.get_nowait())
+            except queue.Empty:
+                break
+        for request, future in calls:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(executor.process_request(request))
+            except Exception as e:
+                # 处理请求时出错
+                logger.exception("处理请求时出错: %s", e)
+                future.set_exception(e)
+        _flush_responses()
+
+def _queue_response(ws, request_id, future):
+    """请求处理完成后把结果加入待发送的响应"""
+    exc = future.exception()
+    if exc is None:
+        response = {'id': request_id, 'result': future.result(), 'error': None}
+    else:
+        error = {'message': str(exc), 'type': type(exc).__name__}
+        # 完整的调用栈只在调试时附带，格式化调用栈开销不小，也会增大响应
+        if logger.isEnabledFor(logging.DEBUG):
+            error['traceback'] = ''.join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+        response = {'id': request_id, 'result': None, 'error': error}
+    _outgoing_responses.setdefault(ws, []).append(response)
+
+def _flush_responses():
+    """把待发送的响应发回MCP服务器
+
+    每条响应仍是一条独立的'response'消息，同一连接的多条消息编码为WebSocket帧后一次写入套接字。
+    """
+    while _outgoing_responses:
+        ws, responses = _outgoing_responses.popitem()
+        payloads = [_dumps({'type': 'response', 'response': response}) for response in responses]
+        try:
+            if len(payloads) == 1:
+                ws.send(payloads[0])
+            else:
+                _send_text_frames(ws, payloads)
         except Exception as e:
-            logger.error(f"请求处理线程中出错: {e}")
-            traceback.print_exc()
-            time.sleep(1)  # 出错后等待一段时间再继续
+            logger.error("发送响应时出错: %s", e)
+
+def _send_text_frames(ws, payloads):
+    """把多条文本消息编码为WebSocket帧，在发送锁内一次写入套接字"""
+    import websocket
+    conn = ws.sock
+    data = b"".join(
+        websocket.ABNF.create_frame(payload, websocket.ABNF.OPCODE_TEXT).format()
+        for payload in payloads
+    )
+    with conn.lock:
+        conn.sock.sendall(data)
 
 def _start_websocket_client(host, port):
     """启动WebSocket客户端，连接到MCP服务器"""
-    global _websocket_client, _running
+    global _websocket_client
     
     # 构建WebSocket URL
     ws_url = f"ws://{host}:{port}"
-    logger.info(f"正在连接到MCP服务器: {ws_url}")
+    logger.info("正在连接到MCP服务器: %s", ws_url)
     
+    # 连续失败的次数，决定下一次重连前的等待时间
     retry_count = 0
-    max_retries = 5
     
-    while _running and retry_count < max_retries:
+    # 一直重连到stop()被调用为止
+    while not _stop_event.is_set():
         try:
             # 尝试导入websocket-client库
             try:
@@ -218,106 +241,105 @@ def _start_websocket_client(host, port):
             
             # 创建一个WebSocketApp
             logger.info("创建WebSocketApp连接...")
+            connected = threading.Event()
+            
+            def on_open(ws):
+                connected.set()
+                _handle_websocket_open(ws)
+            
             _websocket_client = websocket.WebSocketApp(
                 ws_url,
-                on_open=_handle_websocket_open,
+                on_open=on_open,
                 on_message=_handle_websocket_message,
                 on_error=_handle_websocket_error,
                 on_close=_handle_websocket_close
             )
             
-            # 在单独的线程中运行WebSocket客户端
-            websocket_thread = threading.Thread(target=_websocket_client.run_forever)
-            websocket_thread.daemon = True
-            websocket_thread.start()
+            # stop()可能在创建连接期间被调用，此时不再连接
+            if _stop_event.is_set():
+                break
             
-            # 等待一段时间，确保连接成功
-            start_time = time.time()
-            while time.time() - start_time < 5:  # 5秒超时
-                if _websocket_client.sock and _websocket_client.sock.connected:
-                    logger.info("WebSocket连接成功")
-                    return True
-                time.sleep(0.1)
+            # 直接在当前线程中运行WebSocket客户端，连接关闭或失败时返回，
+            # 不需要额外的线程和轮询连接状态。
+            # 连接的存活检查使用WebSocket协议自带的ping/pong控制帧
+            _websocket_client.run_forever(
+                ping_interval=WEBSOCKET_PING_INTERVAL,
+                ping_timeout=WEBSOCKET_PING_TIMEOUT
+            )
+            if _stop_event.is_set():
+                break
             
-            # 连接超时
-            logger.warning("WebSocket连接超时，正在重试...")
-            retry_count += 1
+            if connected.is_set():
+                # 已建立的连接断开，重新计数
+                retry_count = 0
+                logger.warning("WebSocket连接已断开，正在重连...")
+            else:
+                retry_count += 1
+                logger.warning("WebSocket连接失败，第%s次重试...", retry_count)
             
         except Exception as e:
-            logger.error(f"WebSocket连接失败: {str(e)}")
             retry_count += 1
-            time.sleep(1)  # 等待1秒后重试
-    
-    if retry_count >= max_retries:
-        logger.error(f"WebSocket连接失败，已达到最大重试次数: {max_retries}")
+            logger.error("WebSocket连接失败: %s", e)
+        
+        # stop()会设置事件，立即结束等待
+        _stop_event.wait(_reconnect_delay(retry_count))
     
     return False
 
+def _reconnect_delay(retry_count):
+    """计算下一次重连前的等待时间：指数退避，并加入少量随机抖动，
+    避免多个Blender实例同时重连"""
+    # 限制指数，长时间重连时避免整数过大
+    return min(RECONNECT_MAX_DELAY, 0.5 * (2 ** min(retry_count, 10))) + random.uniform(0, 0.25)
+
 def _handle_websocket_open(ws):
     """WebSocket连接打开时的处理函数"""
     logger.info("已连接到MCP服务器")
     
     # 注册客户端
     try:
-        register_message = {
-            'type': 'register',
-            'role': 'blender',
-            'version': globals.VERSION
-        }
-        ws.send(json.dumps(register_message))
+        ws.send(_REGISTER_FRAME)
     except Exception as e:
-        logger.error(f"注册客户端时出错: {e}")
-        traceback.print_exc()
+        logger.exception("注册客户端时出错: %s", e)
 
 def _handle_websocket_message(ws, message):
     """处理WebSocket接收到的消息"""
     try:
         # 解析消息
-        data = json.loads(message)
+        data = _loads(message)
         
         # 根据消息类型处理
         if data['type'] == 'request':
-            # 将请求放入队列
-            ipc.REQUEST_QUEUE.put(data['request'])
-        elif data['type'] == 'ping':
-            # 响应ping消息
-            pong_message = {
-                'type': 'pong',
-                'timestamp': data.get('timestamp', time.time())
-            }
-            ws.send(json.dumps(pong_message))
-        
-        # 检查响应队列
-        while not ipc.RESPONSE_QUEUE.empty():
-            try:
-                response = ipc.RESPONSE_QUEUE.get(block=False)
-                if response:
-                    response_message = {
-                        'type': 'response',
-                        'response': response
-                    }
-                    ws.send(json.dumps(response_message))
-            except Exception as e:
-                logger.error(f"发送响应时出错: {e}")
-                break
+            # 将请求放入队列，处理完成后由回调加入待发送的响应
+            request = data['request']
+            future = concurrent.futures.Future()
+            if 'id' in request:
+                future.add_done_callback(
+                    lambda f, request_id=request['id']: _queue_response(ws, request_id, f)
+                )
+            _pending_calls.put((request, future))
                 
     except Exception as e:
-        logger.error(f"处理WebSocket消息时出错: {e}")
-        traceback.print_exc()
+        logger.exception("处理WebSocket消息时出错: %s", e)
 
 def _handle_websocket_error(ws, error):
     """处理WebSocket错误"""
-    logger.error(f"WebSocket错误: {error}")
+    logger.error("WebSocket错误: %s", error)
 
 def _handle_websocket_close(ws, close_status_code, close_msg):
     """处理WebSocket连接关闭"""
-    logger.info(f"WebSocket连接已关闭: 状态码={close_status_code}, 消息={close_msg}")
+    logger.info("WebSocket连接已关闭: 状态码=%s, 消息=%s", close_status_code, close_msg)
 
 def is_running():
     """检查监听器是否正在运行
     
+    直接检查处理线程是否存活，线程意外退出后不会误报为运行中。
+    
     Returns:
         bool: 监听器是否正在运行
     """
-    global _running
-    return _running
+    return (
+        _processor_thread is not None
+        and _processor_thread.is_alive()
+        and not _stop_event.is_set()
+    )
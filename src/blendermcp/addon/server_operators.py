@@ -4,11 +4,15 @@ BlenderMCP服务器操作模块
 该模块提供了启动和停止MCP服务器的功能，支持WebSocket和标准输入/输出模式。
 """
 
+import functools
 import os
 import sys
+import signal
+import socket
 import subprocess
 import threading
 import logging
+import select
 import tempfile
 import time
 from pathlib import Path
@@ -39,10 +43,58 @@ logger = logging.getLogger("BlenderMCP.Server")
 
 # 全局变量
 SERVER_PROCESS = None
+# 已发送终止信号、等待退出的进程
+STOPPING_PROCESS = None
 SERVER_LOG_FILE = os.path.join(tempfile.gettempdir(), "blendermcp_server_output.log")
+# 最近一次启动服务器时使用的地址，面板和复制URL都从这里读取
+SERVER_ADDRESS = ("localhost", 9876)
 
+# 启动后等待进程提前退出的最长时间(秒)
+SERVER_START_CHECK_TIMEOUT = 1.0
+
+# 启动等待期间检查端口是否开始监听的间隔，以及每次尝试连接的超时(秒)
+SERVER_START_POLL_INTERVAL = 0.02
+SERVER_PROBE_TIMEOUT = 0.05
+
+# 停止服务器时等待进程退出的最长时间(秒)
+SERVER_STOP_TIMEOUT = 5.0
+
+# 服务器输出转入面板日志列表的检查间隔(秒)，没有新输出时逐步放慢到最大间隔
+SERVER_OUTPUT_POLL_INTERVAL = 0.5
+SERVER_OUTPUT_POLL_MAX_INTERVAL = 2.0
+
+# 服务器日志文件中已转入面板的字节数
+_output_offset = 0
+
+# 下一次检查服务器输出前的等待时间(秒)
+_output_poll_interval = SERVER_OUTPUT_POLL_INTERVAL
+
+# 读取服务器日志文件的句柄，服务器运行期间保持打开，每次检查不再重新打开文件
+_output_file = None
+
+# 面板显示的服务器状态缓存，由refresh_server_status更新
+_status_cache = None
+
+# 日志行中的级别标记
+_OUTPUT_LEVELS = (
+    (" - ERROR - ", 'ERROR'),
+    (" - CRITICAL - ", 'ERROR'),
+    (" - WARNING - ", 'WARNING'),
+)
+
+# 服务器脚本的候选位置(插件目录下的子目录和文件名)，按优先级排列，首先尝试简化版服务器脚本
+_SCRIPT_CANDIDATES = (
+    ("server", "run_mcp_server_simple.py"),
+    ("server", "run_mcp_server.py"),
+    ("scripts", "start_mcp_service.py"),
+)
+
+@functools.lru_cache(maxsize=1)
 def get_addon_path():
-    """获取插件路径"""
+    """获取插件路径
+    
+    插件路径在进程内不会变化，只在第一次调用时遍历脚本目录查找，之后返回缓存的结果。
+    """
     if HAS_BPY:
         # 在Blender中运行时
         # 获取所有脚本路径
@@ -60,62 +112,92 @@ def get_addon_path():
     # 直接运行时
     return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-def get_script_path():
-    """获取服务器脚本路径"""
-    addon_path = get_addon_path()
+@functools.lru_cache(maxsize=1)
+def get_script_path(addon_path=None):
+    """获取服务器脚本路径
     
-    # 首先尝试简化版服务器脚本
-    paths = [
-        os.path.join(addon_path, "server", "run_mcp_server_simple.py"),
-        os.path.join(addon_path, "server", "run_mcp_server.py"),
-        os.path.join(addon_path, "scripts", "start_mcp_service.py")
-    ]
+    找到的路径会被缓存，每次启动服务器时不再重复检查文件是否存在。
+    未找到时抛出的异常不会被缓存。
     
-    for path in paths:
-        if os.path.exists(path):
-            logger.info(f"使用服务器脚本: {path}")
+    Args:
+        addon_path: 调用方已获取的插件路径，为None时重新获取
+    """
+    if addon_path is None:
+        addon_path = get_addon_path()
+    
+    # 每个目录只读取一次文件列表，不再逐个检查候选文件是否存在
+    listings = {}
+    for subdir, name in _SCRIPT_CANDIDATES:
+        if subdir not in listings:
+            try:
+                with os.scandir(os.path.join(addon_path, subdir)) as entries:
+                    listings[subdir] = {entry.name for entry in entries if entry.is_file()}
+            except OSError:
+                listings[subdir] = set()
+        if name in listings[subdir]:
+            path = os.path.join(addon_path, subdir, name)
+            logger.info("使用服务器脚本: %s", path)
             return path
     
     # 如果未找到，记录可用路径并抛出异常
-    logger.error(f"未找到服务器脚本。已检查路径: {paths}")
+    paths = [os.path.join(addon_path, subdir, name) for subdir, name in _SCRIPT_CANDIDATES]
+    logger.error("未找到服务器脚本。已检查路径: %s", paths)
     raise FileNotFoundError(f"未找到服务器脚本。已检查路径: {paths}")
 
-def start_server(host="127.0.0.1", port=9876, debug=False):
+@functools.lru_cache(maxsize=1)
+def get_server_env(addon_path):
+    """获取服务器进程的环境变量
+    
+    只在第一次调用时复制当前环境并设置PYTHONPATH，之后每次启动服务器复用同一个字典，
+    调用方不要修改返回的字典。
+    
+    Args:
+        addon_path: 插件路径，加入PYTHONPATH的最前面
+    """
+    env = os.environ.copy()
+    if "PYTHONPATH" in env:
+        env["PYTHONPATH"] = f"{addon_path}{os.pathsep}{env['PYTHONPATH']}"
+    else:
+        env["PYTHONPATH"] = addon_path
+    # 服务器输出由本模块写入日志文件，服务器脚本不必再写自己的日志文件
+    env["BLENDERMCP_OUTPUT_CAPTURED"] = "1"
+    return env
+
+def start_server(host="127.0.0.1", port=9876, debug=False, wait=True):
     """启动MCP服务器进程
     
     Args:
         host: 服务器主机地址
         port: 服务器端口
         debug: 是否启用调试模式
+        wait: 是否等待一小段时间确认进程没有提前退出。为False时立即返回，
+            由调用方稍后调用check_server_started确认
         
     Returns:
         tuple: (是否成功, 消息)
     """
-    global SERVER_PROCESS
+    global SERVER_PROCESS, STOPPING_PROCESS, SERVER_ADDRESS
+    global _output_offset, _output_poll_interval, _output_file
     
     try:
         # 如果已有进程在运行，先停止
         if SERVER_PROCESS is not None:
             success, message = stop_server()
             if not success:
-                logger.warning(f"停止旧服务器失败: {message}")
+                logger.warning("停止旧服务器失败: %s", message)
         
-        # 获取脚本路径
+        # 上一次停止的进程还未退出时等待它退出，避免端口仍被占用
+        if STOPPING_PROCESS is not None:
+            _wait_for_exit(STOPPING_PROCESS)
+            STOPPING_PROCESS = None
+        
+        # 获取插件和脚本路径，插件路径同时用于设置PYTHONPATH
+        addon_path = get_addon_path()
         try:
-            script_path = get_script_path()
+            script_path = get_script_path(addon_path)
         except FileNotFoundError as e:
             return False, str(e)
         
-        # 确保日志文件目录存在
-        log_dir = os.path.dirname(SERVER_LOG_FILE)
-        os.makedirs(log_dir, exist_ok=True)
-        
-        # 创建或清空日志文件
-        with open(SERVER_LOG_FILE, 'w', encoding='utf-8') as f:
-            f.write(f"=== BlenderMCP服务器日志 - {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n")
-            f.write(f"正在启动服务器：{host}:{port}\n")
-            f.write(f"脚本路径：{script_path}\n\n")
-        
         # 构建命令
         python_exe = sys.executable
         cmd = [
@@ -129,97 +211,282 @@ def start_server(host="127.0.0.1", port=9876, debug=False):
             cmd.append("--debug")
         
         # 设置环境变量
-        env = os.environ.copy()
-        addon_path = get_addon_path()
-        if "PYTHONPATH" in env:
-            env["PYTHONPATH"] = f"{addon_path}{os.pathsep}{env['PYTHONPATH']}"
-        else:
-            env["PYTHONPATH"] = addon_path
-            
-        # 记录启动命令
-        logger.info(f"启动服务器命令: {' '.join(cmd)}")
-        logger.info(f"PYTHONPATH: {env['PYTHONPATH']}")
-        with open(SERVER_LOG_FILE, 'a', encoding='utf-8') as f:
-            f.write(f"启动命令: {' '.join(cmd)}\n")
-            f.write(f"PYTHONPATH: {env['PYTHONPATH']}\n")
+        env = get_server_env(addon_path)
         
-        # 重定向输出到日志文件
-        log_file = open(SERVER_LOG_FILE, 'a', encoding='utf-8')
+        # 记录启动命令，与日志文件头部共用同一个字符串，合并为一条日志记录
+        command_line = ' '.join(cmd)
+        logger.info("启动服务器命令: %s (PYTHONPATH: %s)", command_line, env['PYTHONPATH'])
         
         # 启动进程
         creationflags = 0
         if sys.platform == "win32":
-            creationflags = subprocess.CREATE_NO_WINDOW
-            
-        SERVER_PROCESS = subprocess.Popen(
-            cmd,
-            env=env,
-            stdout=log_file,
-            stderr=log_file,
-            text=True,
-            creationflags=creationflags
-        )
+            # 不创建控制台，并放到独立的进程组中，Blender控制台的Ctrl+C不会发给服务器
+            creationflags = (
+                subprocess.CREATE_NO_WINDOW
+                | subprocess.DETACHED_PROCESS
+                | subprocess.CREATE_NEW_PROCESS_GROUP
+            )
         
-        # 等待一小段时间，检查进程是否成功启动
-        time.sleep(1)
-        if SERVER_PROCESS.poll() is not None:
-            # 进程已退出，读取日志文件获取错误信息
-            log_file.close()
-            with open(SERVER_LOG_FILE, 'r', encoding='utf-8') as f:
-                log_content = f.read()
-            
-            # 进程退出代码
-            exit_code = SERVER_PROCESS.returncode
-            error_msg = f"服务器进程退出，代码: {exit_code}\n"
-            error_msg += f"日志内容:\n{log_content}"
+        # 日志文件只打开一次：先写入头部信息，再把输出重定向到同一个文件。
+        # 子进程继承文件描述符，启动后本进程即可关闭自己的句柄
+        # （日志位于系统临时目录，无需创建目录）
+        with open(SERVER_LOG_FILE, 'w', encoding='utf-8') as log_file:
+            log_file.write(
+                f"=== BlenderMCP服务器日志 - {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n"
+                f"正在启动服务器：{host}:{port}\n"
+                f"脚本路径：{script_path}\n\n"
+                f"启动命令: {command_line}\n"
+                f"PYTHONPATH: {env['PYTHONPATH']}\n"
+            )
+            log_file.flush()
             
-            SERVER_PROCESS = None
-            logger.error(error_msg)
-            return False, f"服务器启动失败，退出代码: {exit_code}"
+            SERVER_PROCESS = subprocess.Popen(
+                cmd,
+                env=env,
+                # 服务器不从标准输入读取，不继承Blender的标准输入
+                stdin=subprocess.DEVNULL,
+                stdout=log_file,
+                stderr=log_file,
+                text=True,
+                creationflags=creationflags,
+                # 在POSIX上放到独立的会话中，停止时可以一并结束服务器启动的子进程，
+                # 终端中的Ctrl+C也不会直接发给服务器
+                start_new_session=(sys.platform != "win32")
+            )
+        
+        logger.info("服务器进程已启动，PID: %s", SERVER_PROCESS.pid)
+        SERVER_ADDRESS = (host, port)
+        refresh_server_status()
+        
+        # 服务器输出写入日志文件，由定时器在主线程中增量读取并显示在面板中
+        if HAS_BPY:
+            _close_output_file()
+            _output_file = open(SERVER_LOG_FILE, 'rb')
+            _output_offset = 0
+            _output_poll_interval = SERVER_OUTPUT_POLL_INTERVAL
+            if not bpy.app.timers.is_registered(_pump_server_output):
+                bpy.app.timers.register(_pump_server_output, first_interval=SERVER_OUTPUT_POLL_INTERVAL)
+        
+        if not wait:
+            return True, f"服务器正在启动，PID: {SERVER_PROCESS.pid}"
         
-        logger.info(f"服务器进程已启动，PID: {SERVER_PROCESS.pid}")
-        return True, f"服务器已启动，PID: {SERVER_PROCESS.pid}"
+        # 检查进程是否成功启动：端口开始监听或进程提前退出时立即返回，
+        # 最多等待SERVER_START_CHECK_TIMEOUT
+        deadline = time.monotonic() + SERVER_START_CHECK_TIMEOUT
+        while time.monotonic() < deadline and not is_server_listening():
+            try:
+                SERVER_PROCESS.wait(timeout=SERVER_START_POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+        return check_server_started()
         
     except Exception as e:
-        logger.error(f"启动服务器时出错: {e}", exc_info=True)
+        logger.error("启动服务器时出错: %s", e, exc_info=True)
         return False, f"启动服务器时出错: {e}"
 
-def stop_server():
-    """停止MCP服务器进程
+def check_server_started():
+    """检查刚启动的服务器进程是否仍在运行
     
     Returns:
         tuple: (是否成功, 消息)
     """
     global SERVER_PROCESS
     
+    if SERVER_PROCESS is None:
+        return False, "没有运行的服务器进程"
+    
+    if SERVER_PROCESS.poll() is not None:
+        # 进程已退出，读取日志文件获取错误信息
+        with open(SERVER_LOG_FILE, 'r', encoding='utf-8') as f:
+            log_content = f.read()
+        
+        # 进程退出代码
+        exit_code = SERVER_PROCESS.returncode
+        error_msg = f"服务器进程退出，代码: {exit_code}\n"
+        error_msg += f"日志内容:\n{log_content}"
+        
+        SERVER_PROCESS = None
+        refresh_server_status()
+        logger.error(error_msg)
+        return False, f"服务器启动失败，退出代码: {exit_code}"
+    
+    return True, f"服务器已启动，PID: {SERVER_PROCESS.pid}"
+
+def is_server_listening():
+    """尝试连接服务器端口，判断服务器是否已开始接受连接
+    
+    Returns:
+        bool: 端口是否可以连接，STDIO模式(端口为0)下总是返回False
+    """
+    host, port = SERVER_ADDRESS
+    if not port:
+        return False
+    # 绑定到所有网络接口时通过本机地址连接
+    if host in ("", "0.0.0.0"):
+        host = "127.0.0.1"
+    try:
+        with socket.create_connection((host, port), timeout=SERVER_PROBE_TIMEOUT):
+            return True
+    except OSError:
+        return False
+
+def _pump_server_output():
+    """把服务器日志文件中新写入的完整行加入场景的日志列表
+    
+    服务器输出直接写入文件，不经过管道，进程不会因为缓冲区写满而阻塞。
+    文件没有变大时只检查文件大小，不打开文件；持续没有新输出时逐步放慢检查。
+    进程结束后读完剩余内容即停止定时器。
+    """
+    global _output_offset, _output_poll_interval
+    
+    data = b""
+    try:
+        if _output_file is not None and os.fstat(_output_file.fileno()).st_size > _output_offset:
+            _output_file.seek(_output_offset)
+            data = _output_file.read()
+    except OSError:
+        pass
+    
+    # 只处理完整的行，未写完的行留到下一次；进程结束后不会再有输出，剩余内容一并处理
+    finished = SERVER_PROCESS is None or SERVER_PROCESS.poll() is not None
+    end = len(data) if finished else data.rfind(b"\n") + 1
+    if end:
+        _output_offset += end
+        from . import properties
+        for line in data[:end].decode('utf-8', errors='replace').splitlines():
+            if line:
+                level = next((lvl for marker, lvl in _OUTPUT_LEVELS if marker in line), 'INFO')
+                properties.push_log(line, level)
+    
+    # 顺便检查服务器进程是否意外退出，状态变化时才会重绘面板
+    refresh_server_status()
+    
+    # 进程已退出时停止定时器，服务器状态不再变化，不必继续检查
+    if finished:
+        _close_output_file()
+        return None
+    if data:
+        _output_poll_interval = SERVER_OUTPUT_POLL_INTERVAL
+    else:
+        _output_poll_interval = min(_output_poll_interval * 2, SERVER_OUTPUT_POLL_MAX_INTERVAL)
+    return _output_poll_interval
+
+def _close_output_file():
+    """关闭读取服务器日志文件的句柄"""
+    global _output_file
+    
+    if _output_file is not None:
+        _output_file.close()
+        _output_file = None
+
+def stop_server(wait=True):
+    """停止MCP服务器进程
+    
+    Args:
+        wait: 是否等待进程退出后再返回。为False时由Blender定时器检查进程退出，
+            不阻塞界面
+    
+    Returns:
+        tuple: (是否成功, 消息)
+    """
+    global SERVER_PROCESS, STOPPING_PROCESS
+    
     if SERVER_PROCESS is not None:
+        process = SERVER_PROCESS
+        SERVER_PROCESS = None
+        refresh_server_status()
         try:
-            # 在Windows上，正常终止进程
-            if sys.platform == "win32":
-                import ctypes
-                PROCESS_TERMINATE = 1
-                handle = ctypes.windll.kernel32.OpenProcess(PROCESS_TERMINATE, False, SERVER_PROCESS.pid)
-                ctypes.windll.kernel32.TerminateProcess(handle, 0)
-                ctypes.windll.kernel32.CloseHandle(handle)
-            else:
-                # 在其他平台上，发送终止信号
-                SERVER_PROCESS.terminate()
-                
-            # 等待进程结束
-            SERVER_PROCESS.wait(timeout=5)
+            _terminate_process(process)
+            
+            if wait or not HAS_BPY:
+                _wait_for_exit(process)
+                logger.info("服务器进程已停止，PID: %s", process.pid)
+                return True, "服务器已停止"
             
-            logger.info(f"服务器进程已停止，PID: {SERVER_PROCESS.pid}")
-            SERVER_PROCESS = None
-            return True, "服务器已停止"
+            STOPPING_PROCESS = process
+            _watch_exit(process)
+            return True, "服务器正在停止"
             
         except Exception as e:
-            logger.error(f"停止服务器时出错: {e}")
-            SERVER_PROCESS = None
+            logger.error("停止服务器时出错: %s", e)
             return False, f"停止服务器时出错: {e}"
     else:
         logger.info("没有运行的服务器进程")
         return True, "没有运行的服务器进程"
 
+def _terminate_process(process, force=False):
+    """结束服务器进程
+    
+    在POSIX上向进程所在的会话组发送信号，连同其子进程一起结束；
+    在Windows上Popen.terminate和Popen.kill都调用TerminateProcess。
+    
+    Args:
+        process: 服务器进程
+        force: 是否强制结束(SIGKILL)
+    """
+    if sys.platform == "win32":
+        if force:
+            process.kill()
+        else:
+            process.terminate()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+def _wait_process(process, timeout):
+    """等待进程退出，超时抛出subprocess.TimeoutExpired
+    
+    Linux上通过pidfd在进程退出时立即唤醒，不再由Popen.wait反复休眠检查；
+    其他平台或不支持pidfd时回退到Popen.wait。
+    """
+    if process.returncode is None and hasattr(os, "pidfd_open"):
+        try:
+            fd = os.pidfd_open(process.pid)
+        except OSError:
+            pass
+        else:
+            try:
+                poller = select.poll()
+                poller.register(fd, select.POLLIN)
+                if not poller.poll(timeout * 1000):
+                    raise subprocess.TimeoutExpired(process.args, timeout)
+            finally:
+                os.close(fd)
+    return process.wait(timeout=timeout)
+
+def _wait_for_exit(process):
+    """等待进程退出，超时则强制结束，确保返回时进程已经退出"""
+    try:
+        _wait_process(process, SERVER_STOP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        logger.warning("服务器进程未在%s秒内退出，强制结束", SERVER_STOP_TIMEOUT)
+        _terminate_process(process, force=True)
+        _wait_process(process, SERVER_STOP_TIMEOUT)
+
+def _watch_exit(process):
+    """通过Blender定时器检查进程是否退出，超时则强制结束"""
+    deadline = time.monotonic() + SERVER_STOP_TIMEOUT
+    
+    def check_exit():
+        global STOPPING_PROCESS
+        nonlocal deadline
+        
+        if process.poll() is not None:
+            logger.info("服务器进程已停止，PID: %s", process.pid)
+            if STOPPING_PROCESS is process:
+                STOPPING_PROCESS = None
+            return None
+        if time.monotonic() > deadline:
+            logger.warning("服务器进程未在%s秒内退出，强制结束", SERVER_STOP_TIMEOUT)
+            _terminate_process(process, force=True)
+            deadline = float("inf")
+        return 0.1
+    
+    bpy.app.timers.register(check_exit, first_interval=0.05)
+
 def is_server_running():
     """检查服务器是否正在运行
     
@@ -249,26 +516,32 @@ def get_server_log():
     except Exception as e:
         return f"读取日志文件失败: {e}"
 
-def get_server_mode():
-    """获取服务器模式"""
-    if not is_server_running():
+def get_server_mode(running=None):
+    """获取服务器模式
+    
+    Args:
+        running: 已知的服务器运行状态，为None时重新检查进程
+    """
+    if running is None:
+        running = is_server_running()
+    if not running:
         return "unknown"
     return "websocket"  # 目前仅支持websocket模式
 
 def get_server_host():
     """获取服务器主机地址"""
-    return "localhost"  # 默认值，可以从环境或配置获取
+    return SERVER_ADDRESS[0]
 
 def get_server_port():
     """获取服务器端口"""
-    return 9876  # 默认值，可以从环境或配置获取
+    return SERVER_ADDRESS[1]
 
 def get_server_status():
     """获取服务器状态信息"""
     running = is_server_running()
     status = {
         "is_running": running,
-        "mode": get_server_mode(),
+        "mode": get_server_mode(running),
         "host": get_server_host(),
         "port": get_server_port()
     }
@@ -281,6 +554,31 @@ def get_server_status():
         
     return status
 
+def get_cached_server_status():
+    """获取缓存的服务器状态，供面板每次重绘时读取
+    
+    缓存在服务器启动、停止以及日志定时器检查时更新，重绘时不再检查进程。
+    """
+    if _status_cache is None:
+        refresh_server_status()
+    return _status_cache
+
+def refresh_server_status():
+    """重新获取服务器状态，状态变化时通知3D视图重绘面板"""
+    global _status_cache
+    
+    status = get_server_status()
+    if status == _status_cache:
+        return
+    _status_cache = status
+    
+    window_manager = getattr(bpy.context, "window_manager", None) if HAS_BPY else None
+    if window_manager is not None:
+        for window in window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'VIEW_3D':
+                    area.tag_redraw()
+
 # Blender操作类：启动服务器
 class BLENDERMCP_OT_StartServer(Operator):
     """启动BlenderMCP服务器"""
@@ -289,28 +587,58 @@ class BLENDERMCP_OT_StartServer(Operator):
     bl_description = "启动BlenderMCP服务器进程"
     bl_options = {'REGISTER'}
     
+    _timer = None
+    _deadline = 0.0
+    
     def execute(self, context):
-        if HAS_BPY:
-            # 获取插件偏好设置
-            from . import preferences
-            prefs = preferences.get_addon_preferences(context)
-            
-            # 获取WebSocket主机和端口
-            ws_host = prefs.websocket_host
-            ws_port = prefs.websocket_port
-            
-            # 启动服务器
-            success, message = start_server(host=ws_host, port=ws_port, debug=True)
-        else:
+        if not HAS_BPY:
             # 直接启动服务器（用于测试）
             success, message = start_server(debug=True)
+            self.report({'INFO'} if success else {'ERROR'}, message)
+            return {'FINISHED'}
+        
+        # 获取插件偏好设置
+        from . import preferences
+        prefs = preferences.get_addon_preferences(context)
+        
+        # 启动服务器，不在界面线程中等待，由模态定时器检查进程是否提前退出
+        success, message = start_server(
+            host=prefs.websocket_host,
+            port=prefs.websocket_port,
+            debug=True,
+            wait=False
+        )
+        if not success:
+            self.report({'ERROR'}, message)
+            return {'CANCELLED'}
+        
+        self._deadline = time.monotonic() + SERVER_START_CHECK_TIMEOUT
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.05, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        
+        success, message = check_server_started()
+        if success and time.monotonic() < self._deadline and not is_server_listening():
+            return {'PASS_THROUGH'}
         
+        context.window_manager.event_timer_remove(self._timer)
+        self._timer = None
         if success:
             self.report({'INFO'}, message)
-        else:
-            self.report({'ERROR'}, message)
-            
-        return {'FINISHED'}
+            return {'FINISHED'}
+        self.report({'ERROR'}, message)
+        return {'CANCELLED'}
+    
+    def cancel(self, context):
+        # 窗口关闭或加载新文件时Blender会取消模态操作，需要移除定时器
+        if self._timer is not None:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
 
 # Blender操作类：停止服务器
 class BLENDERMCP_OT_StopServer(Operator):
@@ -321,8 +649,8 @@ class BLENDERMCP_OT_StopServer(Operator):
     bl_options = {'REGISTER'}
     
     def execute(self, context):
-        # 停止服务器
-        success, message = stop_server()
+        # 停止服务器，进程退出由定时器检查，不阻塞界面
+        success, message = stop_server(wait=False)
         
         if success:
             self.report({'INFO'}, message)
@@ -409,14 +737,30 @@ classes = (
     BLENDERMCP_OT_CopyWebSocketURL,
 )
 
-def register():
-    """注册操作类"""
-    if HAS_BPY:
-        for cls in classes:
-            bpy.utils.register_class(cls)
-
-def unregister():
-    """注销操作类"""
-    if HAS_BPY:
-        for cls in reversed(classes):
-            bpy.utils.unregister_class(cls) 
+if HAS_BPY:
+    # 由Blender生成的注册和注销函数，注销时逆序
+    register, _unregister_classes = bpy.utils.register_classes_factory(classes)
+    
+    def unregister():
+        """注销操作类
+        
+        同时清空缓存的插件路径、脚本路径和环境变量，插件被移动或重新安装后再次启用时重新查找。
+        读取服务器输出的定时器引用本模块的函数，注销后不能继续运行。
+        """
+        if bpy.app.timers.is_registered(_pump_server_output):
+            bpy.app.timers.unregister(_pump_server_output)
+        _close_output_file()
+        _unregister_classes()
+        get_addon_path.cache_clear()
+        get_script_path.cache_clear()
+        get_server_env.cache_clear()
+else:
+    def register():
+        """注册操作类"""
+        pass
+    
+    def unregister():
+        """注销操作类"""
+        get_addon_path.cache_clear()
+        get_script_path.cache_clear()
+        get_server_env.cache_clear() 
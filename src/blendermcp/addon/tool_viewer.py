@@ -54,6 +54,12 @@ import subprocess
 import tempfile
 from . import server_operators
 
+# 工具启用状态对应的文字和图标
+_STATUS_LABELS = {
+    True: ("已启用", 'CHECKMARK'),
+    False: ("已禁用", 'X'),
+}
+
 # 工具列表项
 class MCP_UL_ToolsList(UIList):
     """MCP工具列表"""
@@ -68,10 +74,8 @@ class MCP_UL_ToolsList(UIList):
                 row.label(text=item.category)
             
             # 显示工具状态
-            if item.enabled:
-                row.label(text="已启用", icon='CHECKMARK')
-            else:
-                row.label(text="已禁用", icon='X')
+            text, status_icon = _STATUS_LABELS[item.enabled]
+            row.label(text=text, icon=status_icon)
         
         elif self.layout_type in {'GRID'}:
             layout.alignment = 'CENTER'
@@ -393,18 +397,27 @@ classes = (
     MCP_OT_ExportToolsList,
 )
 
+def register_properties():
+    """注册场景属性，需在注册类之后调用"""
+    bpy.types.Scene.mcp_tools = bpy.props.CollectionProperty(type=MCPToolProperty)
+    bpy.types.Scene.mcp_tool_index = bpy.props.IntProperty(default=0)
+
+def unregister_properties():
+    """注销场景属性，需在注销类之前调用"""
+    del bpy.types.Scene.mcp_tool_index
+    del bpy.types.Scene.mcp_tools
+
+if HAS_BPY:
+    _register_classes, _unregister_classes = bpy.utils.register_classes_factory(classes)
+
 def register():
-    for cls in classes:
-        bpy.utils.register_class(cls)
+    _register_classes()
     
     # 注册属性
-    bpy.types.Scene.mcp_tools = bpy.props.CollectionProperty(type=MCPToolProperty)
-    bpy.types.Scene.mcp_tool_index = bpy.props.IntProperty(default=0)
+    register_properties()
 
 def unregister():
     # 注销属性
-    del bpy.types.Scene.mcp_tool_index
-    del bpy.types.Scene.mcp_tools
+    unregister_properties()
     
-    for cls in reversed(classes):
-        bpy.utils.unregister_class(cls) 
\ No newline at end of file
+    _unregister_classes() 
\ No newline at end of file
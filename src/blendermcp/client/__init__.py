@@ -0,0 +1,8 @@
+"""
+BlenderMCP客户端包
+"""
+
+from .client import BlenderMCPClient
+from .connection import ConnectionPool
+
+__all__ = ['BlenderMCPClient', 'ConnectionPool']
@@ -0,0 +1,386 @@
+"""
+BlenderMCP客户端
+
+该模块通过TCP套接字向Blender发送JSON命令，命令和响应格式见docs/API_REFERENCE.md。
+每条消息带4字节大端长度前缀，对端需要使用相同的分帧方式；随插件提供的WebSocket服务器不使用这种分帧。
+"""
+
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+import socket
+import struct
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
+
+from ..common.errors import ConnectionError
+
+# 优先使用orjson进行序列化，未安装时回退到标准库json
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+    _loads = json.loads
+
+# 设置日志
+logger = logging.getLogger("BlenderMCP.Client")
+
+# 写任务单次合并写入的数据量上限
+_MAX_WRITE = 64 * 1024
+
+# 每条消息的长度前缀：4字节大端无符号整数
+_HEADER = struct.Struct(">I")
+
+# 套接字收发缓冲区大小，批量响应可能较大
+_SOCKET_BUFFER_SIZE = 1 << 20
+
+class BlenderMCPClient:
+    """BlenderMCP客户端
+
+    请求按ID与响应对应，同一个连接上的并发命令会在写任务中串行发送，
+    调用方不需要额外加锁即可在多个协程间共享一个客户端。
+    """
+
+    # 进程内共享的客户端，按事件循环分组，每个循环有自己的锁和按(host, port)区分的客户端。
+    # 连接和锁都绑定在创建它们的循环上，多次asyncio.run()之间不能复用
+    _shared: ClassVar[Dict[asyncio.AbstractEventLoop, Tuple[asyncio.Lock, Dict[Tuple[str, int], "BlenderMCPClient"]]]] = {}
+
+    def __init__(self, host: str = "localhost", port: int = 9876, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        # 所有命令经由发送队列交给单个写任务，响应按请求ID分发给等待者
+        self._out_q: Optional[asyncio.Queue] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    async def get_shared(cls, host: str = "localhost", port: int = 9876) -> "BlenderMCPClient":
+        """获取进程内共享的已连接客户端
+
+        多个脚本或任务复用同一个连接，省去每次建立和关闭TCP连接的开销。
+        连接断开后再次调用会重新连接。共享范围是当前运行的事件循环。
+        """
+        lock, clients = cls._shared_for_loop()
+        async with lock:
+            client = clients.get((host, port))
+            if client is None:
+                client = clients[(host, port)] = cls(host, port)
+            if not client.connected:
+                await client.stop()
+                await client.start()
+            return client
+
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def session(cls, host: str = "localhost", port: int = 9876):
+        """以上下文管理器的形式使用共享客户端
+
+        退出上下文时不会断开连接，后续的session()继续复用同一个连接，
+        进程结束前调用close_shared()统一关闭。
+        """
+        yield await cls.get_shared(host, port)
+
+    @classmethod
+    async def close_shared(cls):
+        """关闭当前事件循环中的所有共享客户端"""
+        state = cls._shared.pop(asyncio.get_running_loop(), None)
+        if state is None:
+            return
+        clients = list(state[1].values())
+        await asyncio.gather(*(client.stop() for client in clients), return_exceptions=True)
+
+    @classmethod
+    def _shared_for_loop(cls):
+        """获取当前事件循环的锁和共享客户端，同时丢弃已关闭的循环留下的客户端"""
+        loop = asyncio.get_running_loop()
+        for closed in [other for other in cls._shared if other.is_closed()]:
+            del cls._shared[closed]
+        state = cls._shared.get(loop)
+        if state is None:
+            state = cls._shared[loop] = (asyncio.Lock(), {})
+        return state
+
+    @property
+    def connected(self) -> bool:
+        """连接是否可用"""
+        return self._writer is not None and all(not task.done() for task in self._tasks)
+
+    async def start(self):
+        """连接到Blender"""
+        if self._writer is not None:
+            return
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise ConnectionError(f"无法连接到Blender: {self.host}:{self.port}", {"error": str(e)})
+        _configure_socket(self._writer.get_extra_info('socket'))
+
+        self._out_q = asyncio.Queue()
+        self._tasks = [
+            asyncio.ensure_future(self._write_loop()),
+            asyncio.ensure_future(self._read_loop()),
+        ]
+        logger.info(f"已连接到Blender: {self.host}:{self.port}")
+
+    async def stop(self):
+        """断开与Blender的连接"""
+        if self._writer is None:
+            return
+        # 先结束等待中的请求，读写任务被取消时不会再用它们自己的错误覆盖
+        self._fail_pending(ConnectionError("客户端已断开连接"))
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except OSError:
+            pass
+        self._reader = None
+        self._writer = None
+        self._out_q = None
+        logger.info("已断开与Blender的连接")
+
+    async def send_command(self, command_type: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """发送命令并等待响应
+
+        Args:
+            command_type: 命令类型
+            params: 命令参数
+
+        Returns:
+            dict: 服务器响应
+        """
+        if self._writer is None:
+            raise ConnectionError("客户端未连接")
+        # 读写任务已经结束时不再排队，否则调用方要等到超时
+        if not self.connected:
+            raise ConnectionError("连接已断开")
+
+        # 在调用方中编码，参数无法序列化时异常直接抛给调用方，不会影响共享的写任务
+        request_id = next(self._ids)
+        frame = _encode_frame({"id": request_id, "type": command_type, "params": params or {}})
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        await self._out_q.put(frame)
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _write_loop(self):
+        """发送队列中已编码的命令，队列中已积压的命令合并为一次写入
+
+        写入失败时任务结束，等待中的请求以ConnectionError结束。
+        """
+        error = ConnectionError("发送任务已停止")
+        try:
+            while True:
+                # 每次写入使用新的缓冲区，传输层可能在write()返回后仍持有它
+                buf = bytearray(await self._out_q.get())
+                while len(buf) < _MAX_WRITE and not self._out_q.empty():
+                    buf += self._out_q.get_nowait()
+                self._writer.write(buf)
+                await self._writer.drain()
+        except OSError as e:
+            error = ConnectionError(f"发送命令失败: {e}")
+            logger.warning(str(error))
+        finally:
+            self._fail_pending(error)
+
+    async def _read_loop(self):
+        """读取服务器响应并按ID唤醒对应的请求
+
+        连接关闭、读取失败或收到无法解析的响应时任务结束，等待中的请求以ConnectionError结束。
+        """
+        error = ConnectionError("接收任务已停止")
+        try:
+            while True:
+                try:
+                    header = await self._reader.readexactly(_HEADER.size)
+                    payload = await self._reader.readexactly(_HEADER.unpack(header)[0])
+                except asyncio.IncompleteReadError:
+                    raise ConnectionError("连接已被服务器关闭")
+                except OSError as e:
+                    raise ConnectionError(f"读取响应失败: {e}")
+                try:
+                    response = _loads(payload)
+                except ValueError as e:
+                    # 帧边界已经不可信，无法继续读取后续响应
+                    raise ConnectionError(f"无法解析响应: {e}")
+                self._dispatch(response)
+        except ConnectionError as e:
+            error = e
+            logger.warning(str(error))
+        finally:
+            self._fail_pending(error)
+
+    def _dispatch(self, response: Dict[str, Any]):
+        """将响应交给等待该ID的请求"""
+        request_id = response.get("id") if isinstance(response, dict) else None
+        future = self._pending.get(request_id)
+        if future is None or future.done():
+            logger.warning(f"收到未知请求的响应: {request_id}")
+            return
+        future.set_result(response)
+
+    def _fail_pending(self, error: Exception):
+        """以错误结束所有等待中的请求"""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    # 兼容旧的示例脚本
+    _send_command = send_command
+
+    async def get_scene_info(self) -> Dict[str, Any]:
+        """获取当前场景信息"""
+        return await self.send_command("get_scene_info")
+
+    async def create_object(
+        self,
+        object_type: str,
+        object_name: Optional[str] = None,
+        location: Optional[List[float]] = None,
+        rotation: Optional[List[float]] = None,
+        scale: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        """创建对象"""
+        return await self.send_command(
+            "create_object",
+            _object_spec(object_type, object_name, location, rotation, scale)
+        )
+
+    async def create_objects(self, specs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """在一次请求中批量创建对象
+
+        Args:
+            specs: 对象参数列表，每项的键与create_object的参数相同
+
+        Returns:
+            dict: 服务器响应，result["items"]按顺序对应每个对象的结果
+        """
+        items = [_object_spec(**spec) for spec in specs]
+        return await self.send_command("create_objects", {"items": items})
+
+    async def set_material(
+        self,
+        object_name: str,
+        material_name: Optional[str] = None,
+        color: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        """为对象设置材质"""
+        return await self.send_command(
+            "set_material",
+            _material_spec(object_name, material_name, color)
+        )
+
+    async def set_materials(self, specs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """在一次请求中批量设置材质
+
+        Args:
+            specs: 材质参数列表，每项的键与set_material的参数相同
+
+        Returns:
+            dict: 服务器响应
+        """
+        items = [_material_spec(**spec) for spec in specs]
+        return await self.send_command("set_materials", {"items": items})
+
+    async def create_linked_instance(
+        self,
+        source_name: str,
+        instance_name: Optional[str] = None,
+        location: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        """创建与源对象共享网格数据的关联实例"""
+        return await self.send_command(
+            "create_linked_instance",
+            _instance_spec(source_name, instance_name, location)
+        )
+
+    async def create_linked_instances(self, specs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """在一次请求中批量创建关联实例
+
+        Args:
+            specs: 实例参数列表，每项的键与create_linked_instance的参数相同
+
+        Returns:
+            dict: 服务器响应，result["items"]按顺序对应每个实例的结果
+        """
+        items = [_instance_spec(**spec) for spec in specs]
+        return await self.send_command("create_linked_instances", {"items": items})
+
+    async def delete_object(self, name: str) -> Dict[str, Any]:
+        """删除对象"""
+        return await self.send_command("delete_object", {"name": name})
+
+    async def delete_objects(self, names: List[str], flush: bool = False) -> Dict[str, Any]:
+        """在一次请求中批量删除对象
+
+        Args:
+            names: 要删除的对象名称列表
+            flush: 是否在删除后立即更新视图层，默认留给后续操作一并更新
+        """
+        return await self.send_command("delete_objects", {"names": list(names), "flush": flush})
+
+def _configure_socket(sock):
+    """关闭Nagle算法并调整缓冲区，避免小命令被延迟发送"""
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _SOCKET_BUFFER_SIZE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _SOCKET_BUFFER_SIZE)
+    except OSError as e:
+        logger.warning(f"设置套接字选项失败: {e}")
+
+def _encode_frame(message) -> bytes:
+    """将消息编码为带长度前缀的帧"""
+    payload = _dumps(message)
+    return _HEADER.pack(len(payload)) + payload
+
+def _object_spec(object_type, object_name=None, location=None, rotation=None, scale=None):
+    """构建create_object的参数"""
+    params = {"type": object_type}
+    if object_name:
+        params["name"] = object_name
+    if location is not None:
+        params["location"] = location
+    if rotation is not None:
+        params["rotation"] = rotation
+    if scale is not None:
+        params["scale"] = scale
+    return params
+
+def _instance_spec(source_name, instance_name=None, location=None):
+    """构建create_linked_instance的参数"""
+    params = {"source_name": source_name}
+    if instance_name:
+        params["instance_name"] = instance_name
+    if location is not None:
+        params["location"] = location
+    return params
+
+def _material_spec(object_name, material_name=None, color=None):
+    """构建set_material的参数"""
+    params = {"object_name": object_name}
+    if material_name:
+        params["material_name"] = material_name
+    if color is not None:
+        params["color"] = color
+    return params
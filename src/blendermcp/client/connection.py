@@ -0,0 +1,72 @@
+"""
+BlenderMCP连接池
+
+为多用户或多任务场景维护一组到Blender的客户端连接。
+"""
+
+import asyncio
+import logging
+from typing import List, Set
+
+from .client import BlenderMCPClient
+
+# 设置日志
+logger = logging.getLogger("BlenderMCP.ConnectionPool")
+
+class ConnectionPool:
+    """BlenderMCP客户端连接池
+
+    单个客户端已能在协程间并发使用，连接池用于需要把负载分散到多个连接的场景。
+    通过acquire()取得连接，用完后必须调用release()归还。
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 9876,
+                 max_connections: int = 4, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._idle: List[BlenderMCPClient] = []
+        self._clients: Set[BlenderMCPClient] = set()
+
+    async def acquire(self) -> BlenderMCPClient:
+        """取得一个已连接的客户端，连接数达到上限时等待其他连接归还"""
+        await self._semaphore.acquire()
+        try:
+            while self._idle:
+                client = self._idle.pop()
+                if client.connected:
+                    return client
+                await self._discard(client)
+
+            client = BlenderMCPClient(self.host, self.port, self.timeout)
+            await client.start()
+            self._clients.add(client)
+            return client
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def release(self, client: BlenderMCPClient):
+        """归还客户端，已断开的连接直接丢弃"""
+        try:
+            if client.connected:
+                self._idle.append(client)
+            else:
+                await self._discard(client)
+        finally:
+            self._semaphore.release()
+
+    async def close_all(self):
+        """关闭池中所有连接"""
+        clients = list(self._clients)
+        self._idle.clear()
+        self._clients.clear()
+        await asyncio.gather(*(client.stop() for client in clients), return_exceptions=True)
+        logger.info(f"已关闭 {len(clients)} 个连接")
+
+    async def _discard(self, client: BlenderMCPClient):
+        """关闭并移除客户端"""
+        self._clients.discard(client)
+        await client.stop()
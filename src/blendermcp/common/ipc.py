@@ -5,9 +5,9 @@
 """
 
 import multiprocessing
+import queue
 import logging
 import json
-import time
 import uuid
 import threading
 from typing import Dict, Any, Optional, Tuple, Callable
@@ -22,6 +22,12 @@ RESPONSE_QUEUE: Optional[multiprocessing.Queue] = None
 # 响应等待超时时间(秒)
 RESPONSE_TIMEOUT = 30.0
 
+# 监听线程阻塞等待队列的超时时间(秒)
+QUEUE_GET_TIMEOUT = 0.5
+
+# 队列初始化完成后设置，监听线程启动后先等待它，不必轮询队列是否已创建
+_queues_ready = threading.Event()
+
 # 正在等待的请求
 # 格式: {request_id: (event, response_container)}
 waiting_requests: Dict[str, Tuple[threading.Event, Dict[str, Any]]] = {}
@@ -34,6 +40,7 @@ def init_queues():
         REQUEST_QUEUE = multiprocessing.Queue()
     if RESPONSE_QUEUE is None:
         RESPONSE_QUEUE = multiprocessing.Queue()
+    _queues_ready.set()
     
     logger.info("IPC消息队列已初始化")
 
@@ -71,14 +78,17 @@ def start_response_listener(callback: Callable[[Dict[str, Any]], None]):
         callback: 收到响应时的回调函数
     """
     def _listener_thread():
+        _queues_ready.wait()
         while True:
             try:
-                if RESPONSE_QUEUE and not RESPONSE_QUEUE.empty():
-                    response = RESPONSE_QUEUE.get()
-                    callback(response)
+                # 阻塞等待响应，空闲时不占用CPU
+                response = RESPONSE_QUEUE.get(timeout=QUEUE_GET_TIMEOUT)
+            except queue.Empty:
+                continue
+            try:
+                callback(response)
             except Exception as e:
                 logger.error(f"响应监听器错误: {str(e)}")
-            time.sleep(0.01)  # 避免CPU高占用
     
     thread = threading.Thread(target=_listener_thread, daemon=True)
     thread.start()
@@ -152,22 +162,26 @@ def start_request_processor(processor: Callable[[Dict[str, Any]], Dict[str, Any]
         processor: 处理请求的函数，接收请求返回响应
     """
     def _processor_thread():
+        _queues_ready.wait()
         while True:
             try:
-                if REQUEST_QUEUE and not REQUEST_QUEUE.empty():
-                    request = REQUEST_QUEUE.get()
-                    logger.debug(f"收到服务器请求: {request}")
-                    
-                    # 处理请求
-                    response = processor(request)
-                    
-                    # 确保响应包含请求ID
-                    if "id" in request and "id" not in response:
-                        response["id"] = request["id"]
-                    
-                    # 发送响应
-                    RESPONSE_QUEUE.put(response)
-                    logger.debug(f"已发送响应: {response}")
+                # 阻塞等待请求，空闲时不占用CPU
+                request = REQUEST_QUEUE.get(timeout=QUEUE_GET_TIMEOUT)
+            except queue.Empty:
+                continue
+            try:
+                logger.debug(f"收到服务器请求: {request}")
+                
+                # 处理请求
+                response = processor(request)
+                
+                # 确保响应包含请求ID
+                if "id" in request and "id" not in response:
+                    response["id"] = request["id"]
+                
+                # 发送响应
+                RESPONSE_QUEUE.put(response)
+                logger.debug(f"已发送响应: {response}")
             except Exception as e:
                 logger.error(f"处理请求错误: {str(e)}")
                 # 发送错误响应
@@ -178,7 +192,6 @@ def start_request_processor(processor: Callable[[Dict[str, Any]], Dict[str, Any]
                         "message": str(e)
                     }
                     RESPONSE_QUEUE.put(error_response)
-            time.sleep(0.01)  # 避免CPU高占用
     
     thread = threading.Thread(target=_processor_thread, daemon=True)
     thread.start()
@@ -0,0 +1,67 @@
+"""
+日志配置模块
+
+插件中的各个模块共用同一个日志文件。记录日志时只把记录放入队列，
+由后台线程负责写入文件和控制台，避免在Blender主线程中执行文件IO。
+处理器只挂在插件自己的日志记录器上，不修改根日志记录器。
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import tempfile
+from typing import Optional
+
+# 日志格式
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# 插件日志文件，面板中的日志查看也读取该文件
+LOG_FILE = os.path.join(tempfile.gettempdir(), "blendermcp_addon.log")
+
+# 插件使用的顶层日志记录器，模块日志记录器都在它们之下
+LOGGER_NAMES = ("blendermcp", "BlenderMCP")
+
+# 日志记录队列和写入线程
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging(level: int = logging.INFO):
+    """配置插件的日志记录器，重复调用时不做任何事
+
+    只在插件注册时调用，导入模块时不配置日志，也不影响导入者自己的logging配置。
+    标记保存在sys上，插件被重新加载、本模块重新执行时也不会重复配置。
+    设置环境变量BLENDERMCP_DEBUG时额外输出到控制台。
+
+    Args:
+        level: 日志级别
+    """
+    global _listener
+
+    if getattr(sys, "_blendermcp_logging_configured", False):
+        return
+    sys._blendermcp_logging_configured = True
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    # 第一次写日志时才打开文件
+    file_handler = logging.FileHandler(LOG_FILE, encoding='utf-8', delay=True)
+    file_handler.setFormatter(formatter)
+    handlers = [file_handler]
+    if os.environ.get("BLENDERMCP_DEBUG"):
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+
+    _listener = logging.handlers.QueueListener(_queue, *handlers)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    # QueueHandler会预先格式化消息，这里只保留消息本身，完整格式由写入线程中的处理器添加
+    queue_handler = logging.handlers.QueueHandler(_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    for name in LOGGER_NAMES:
+        plugin_logger = logging.getLogger(name)
+        plugin_logger.addHandler(queue_handler)
+        plugin_logger.setLevel(level)
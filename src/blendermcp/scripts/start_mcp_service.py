@@ -102,14 +102,9 @@ def main():
     
     # 启动服务器进程
     try:
-        process = subprocess.Popen(
-            cmd,
-            env=env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=True,
-            bufsize=1
-        )
+        # 服务器直接继承本进程的标准输出和标准错误，不经过管道逐行转发，
+        # 服务器输出很多时也不会因为管道写满而阻塞
+        process = subprocess.Popen(cmd, env=env)
         
         # 创建状态文件以指示服务器正在运行
         status_file = Path(tempfile.gettempdir()) / "blendermcp_server_status.json"
@@ -126,16 +121,8 @@ def main():
         print(f"服务器进程已启动，PID: {process.pid}")
         print(f"状态文件已创建: {status_file}")
         
-        # 实时输出日志
-        while True:
-            line = process.stdout.readline()
-            if not line and process.poll() is not None:
-                break
-            if line:
-                print(line.rstrip())
-        
-        # 检查返回码
-        returncode = process.poll()
+        # 等待服务器进程退出
+        returncode = process.wait()
         if returncode != 0:
             print(f"服务器进程异常退出，返回码: {returncode}")
             return returncode
@@ -18,15 +18,16 @@ import http.server
 import importlib.util
 import traceback  # 添加traceback模块用于详细错误信息
 
-# 设置日志
+# 设置日志。由插件启动时标准错误已被重定向到插件读取的日志文件，
+# 不再额外写一份相同内容的日志文件
 log_file = os.path.join(tempfile.gettempdir(), "blendermcp_server.log")
+log_handlers = [logging.StreamHandler()]
+if not os.environ.get("BLENDERMCP_OUTPUT_CAPTURED"):
+    log_handlers.insert(0, logging.FileHandler(log_file, encoding='utf-8', delay=True))
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+    handlers=log_handlers
 )
 logger = logging.getLogger("MCPServer")
 
@@ -63,6 +64,18 @@ except ImportError:
 # 保存原始模块状态，避免修改现有模块
 original_modules = set(sys.modules.keys())
 
+# 同步线程（HTTP处理、标准输入）中复用的事件循环，每个线程一个
+_thread_loops = threading.local()
+
+def get_thread_loop():
+    """获取当前线程的事件循环，首次调用时创建，之后的请求复用同一个循环"""
+    loop = getattr(_thread_loops, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        _thread_loops.loop = loop
+    return loop
+
 # 定义简单的工具注册函数，避免导入循环依赖
 def register_default_tools(adapter):
     """注册默认工具，不依赖外部模块"""
@@ -82,11 +95,18 @@ def register_default_tools(adapter):
     
     logger.info("默认工具注册完成")
 
-# 初始化IPC队列
-init_queues()
+# IPC队列和响应监听线程在main()中初始化，仅导入本模块时不创建
+_ipc_initialized = False
 
-# 启动响应监听器线程
-response_listener_thread = start_response_listener(handle_blender_response)
+def init_ipc():
+    """初始化IPC队列并启动响应监听线程，重复调用时不做任何事"""
+    global _ipc_initialized
+    
+    if _ipc_initialized:
+        return
+    init_queues()
+    start_response_listener(handle_blender_response)
+    _ipc_initialized = True
 
 # 安全导入工具模块，避免循环依赖
 try:
@@ -408,10 +428,7 @@ async def websocket_server(host, port):
                     content_length = int(self.headers["Content-Length"])
                     post_data = self.rfile.read(content_length).decode()
                     
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    response = loop.run_until_complete(
+                    response = get_thread_loop().run_until_complete(
                         self.adapter.handle_message(post_data)
                     )
                     
@@ -697,6 +714,9 @@ async def main():
         # 设置服务器启动时间
         server_start_time = time.time()
         
+        # 初始化IPC队列和响应监听线程
+        init_ipc()
+        
         # 注册信号处理
         try:
             signal.signal(signal.SIGINT, handle_exit_signal)
@@ -723,19 +743,7 @@ async def main():
 # 入口点
 if __name__ == "__main__":
     try:
-        # 检查是否已有事件循环运行
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                logger.warning("检测到事件循环已在运行，创建新的事件循环")
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-        except Exception as e:
-            logger.warning(f"获取事件循环时出错: {str(e)}，创建新的事件循环")
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        # 使用asyncio.run运行主函数
+        # 使用asyncio.run运行主函数，它会自行创建和关闭事件循环，不需要预先创建
         logger.info("开始运行主函数")
         
         # 尝试使用不同的方法运行主函数，以避免asyncio导入问题
@@ -750,8 +758,15 @@ if __name__ == "__main__":
                 # 方法2: 使用事件循环的run_until_complete
                 loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
-                loop.run_until_complete(main())
-                loop.close()
+                try:
+                    loop.run_until_complete(main())
+                finally:
+                    # 与asyncio.run相同，关闭前先结束异步生成器和默认线程池
+                    try:
+                        loop.run_until_complete(loop.shutdown_asyncgens())
+                        loop.run_until_complete(loop.shutdown_default_executor())
+                    finally:
+                        loop.close()
             except Exception as e2:
                 logger.error(f"使用备用方法1运行主函数时出错: {str(e2)}")
                 logger.warning("尝试使用最后的备用方法运行主函数")
@@ -835,7 +850,8 @@ if __name__ == "__main__":
                                 origins=None
                             )
                             
-                            loop = asyncio.get_event_loop()
+                            # 复用主线程的事件循环，方法2关闭的循环不会再被取到
+                            loop = get_thread_loop()
                             server = loop.run_until_complete(start_server)
                             logger.info(f"WebSocket服务器已启动: ws://{args.host}:{args.port}")
                             
@@ -882,10 +898,8 @@ if __name__ == "__main__":
                                 if not line:
                                     break
                                 
-                                # 创建事件循环处理消息
-                                loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(loop)
-                                response = loop.run_until_complete(adapter.handle_message(line))
+                                # 复用当前线程的事件循环处理消息
+                                response = get_thread_loop().run_until_complete(adapter.handle_message(line))
                                 print(response, flush=True)
                             except Exception as e:
                                 logger.error(f"处理标准输入时出错: {str(e)}")
@@ -16,7 +16,6 @@ import logging
 import tempfile
 import argparse
 import signal
-import threading
 from pathlib import Path
 
 # 第三方库导入
@@ -26,15 +25,26 @@ except ImportError:
     print("错误: 未找到websockets模块。请安装: pip install websockets")
     sys.exit(1)
 
-# 设置日志
+# 消息编解码优先使用orjson，未安装时回退到标准库json
+try:
+    import orjson
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# 设置日志。由插件启动时标准错误已被重定向到插件读取的日志文件，
+# 不再额外写一份相同内容的日志文件
 log_file = os.path.join(tempfile.gettempdir(), "blendermcp_server_simple.log")
+log_handlers = [logging.StreamHandler()]
+if not os.environ.get("BLENDERMCP_OUTPUT_CAPTURED"):
+    log_handlers.insert(0, logging.FileHandler(log_file, encoding='utf-8', delay=True))
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+    handlers=log_handlers
 )
 logger = logging.getLogger("MCPServerSimple")
 
@@ -92,7 +102,7 @@ class MCPAdapter:
         """处理JSON-RPC消息"""
         try:
             # 解析JSON
-            request = json.loads(message)
+            request = _loads(message)
             
             # 提取请求ID
             request_id = request.get("id", None)
@@ -143,7 +153,7 @@ class MCPAdapter:
                 "result": tools_list
             }
             
-            return json.dumps(response)
+            return _dumps(response)
         except Exception as e:
             logger.error(f"处理工具列表请求时出错: {str(e)}")
             logger.exception("工具列表异常")
@@ -195,7 +205,7 @@ class MCPAdapter:
                 "result": result
             }
             
-            return json.dumps(response)
+            return _dumps(response)
         except Exception as e:
             logger.error(f"处理工具调用请求时出错: {str(e)}")
             logger.exception("工具调用异常")
@@ -213,7 +223,7 @@ class MCPAdapter:
                 "message": message
             }
         }
-        return json.dumps(response)
+        return _dumps(response)
 
 # 保存工具列表到文件
 def write_tools_list():
@@ -228,8 +238,8 @@ def write_tools_list():
         return False
 
 # 更新状态文件
-def update_status_file(host, port, mode):
-    """定期更新状态文件"""
+async def update_status_file(host, port, mode):
+    """定期更新状态文件，作为任务运行在服务器的事件循环中"""
     global server_start_time, active_connections, processed_requests
     
     logger.info(f"开始更新状态文件")
@@ -258,11 +268,11 @@ def update_status_file(host, port, mode):
                 json.dump(status_data, f)
             
             # 等待下一次更新
-            time.sleep(1)
+            await asyncio.sleep(1)
         
         except Exception as e:
             logger.error(f"更新状态文件时出错: {str(e)}")
-            time.sleep(1)
+            await asyncio.sleep(1)
 
 # WebSocket服务器
 async def websocket_server(host, port):
@@ -291,7 +301,7 @@ async def websocket_server(host, port):
                         logger.debug(f"发送响应: {response}")
                     except Exception as e:
                         logger.error(f"处理消息时出错: {str(e)}")
-                        error_response = json.dumps({
+                        error_response = _dumps({
                             "jsonrpc": "2.0",
                             "id": None,
                             "error": {
@@ -330,16 +340,24 @@ async def websocket_server(host, port):
             except Exception as e:
                 logger.error(f"获取本机IP地址失败: {str(e)}")
         
-        # 启动状态更新线程
-        try:
-            status_thread = threading.Thread(target=update_status_file, args=(host, port, "websocket"))
-            status_thread.daemon = True
-            status_thread.start()
-        except Exception as e:
-            logger.error(f"启动状态更新线程失败: {str(e)}")
+        # 收到终止信号时关闭服务器，让asyncio.run正常结束并清理事件循环，
+        # 而不是在回调中直接退出进程。Windows的事件循环不支持add_signal_handler，
+        # 仍由main中注册的信号处理函数处理
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, server.close)
+            except (NotImplementedError, RuntimeError):
+                pass
+        
+        # 启动状态更新任务，写入的文件很小，不需要单独的线程
+        status_task = asyncio.ensure_future(update_status_file(host, port, "websocket"))
         
         # 等待服务器关闭
-        await server.wait_closed()
+        try:
+            await server.wait_closed()
+        finally:
+            status_task.cancel()
     
     except Exception as e:
         logger.error(f"WebSocket服务器函数发生严重错误: {str(e)}")
@@ -72,6 +72,69 @@ def create_cylinder_direct(params):
         "object_name": obj.name
     }
 
+# create_object的type与创建网格所用的操作符，MESH默认创建立方体
+_MESH_PRIMITIVES = {
+    "MESH": "primitive_cube_add",
+    "CUBE": "primitive_cube_add",
+    "SPHERE": "primitive_uv_sphere_add",
+    "CYLINDER": "primitive_cylinder_add",
+    "PLANE": "primitive_plane_add",
+    "CONE": "primitive_cone_add",
+    "TORUS": "primitive_torus_add",
+}
+
+def create_object_direct(params):
+    """直接创建对象(无异步)
+
+    type为网格类型（MESH即立方体）时通过操作符创建网格，LIGHT、CAMERA、EMPTY直接创建对应的对象
+    """
+    object_type = str(params.get("type", "MESH")).upper()
+    name = params.get("name", None)
+    location = params.get("location", [0, 0, 0])
+    rotation = params.get("rotation", None)
+    scale = params.get("scale", None)
+    
+    if object_type in _MESH_PRIMITIVES:
+        getattr(bpy.ops.mesh, _MESH_PRIMITIVES[object_type])(location=tuple(location))
+        obj = bpy.context.active_object
+    elif object_type in ("LIGHT", "CAMERA", "EMPTY"):
+        # 直接创建数据块，不经过操作符，也不改变选择状态
+        data_name = name or object_type.capitalize()
+        if object_type == "LIGHT":
+            data = bpy.data.lights.new(data_name, type='POINT')
+        elif object_type == "CAMERA":
+            data = bpy.data.cameras.new(data_name)
+        else:
+            data = None
+        obj = bpy.data.objects.new(data_name, data)
+        obj.location = location
+        bpy.context.collection.objects.link(obj)
+    else:
+        return {"status": "error", "message": f"不支持的对象类型: {object_type}"}
+    
+    if name:
+        obj.name = name
+    if rotation:
+        obj.rotation_euler = rotation
+    if scale:
+        obj.scale = scale
+    
+    return {
+        "status": "success",
+        "message": f"已创建对象: {obj.name}",
+        "object_name": obj.name
+    }
+
+def create_objects_direct(params):
+    """直接批量创建对象(无异步)"""
+    items = [create_object_direct(item) for item in params.get("items", [])]
+    
+    return {
+        "status": "success",
+        "message": f"已创建 {len(items)} 个对象",
+        "items": items
+    }
+
 def transform_object_direct(params):
     """直接变换对象(无异步)"""
     object_name = params.get("object_name", None)
@@ -106,6 +169,118 @@ def delete_object_direct(params):
     
     return {"status": "success", "message": f"已删除对象: {object_name}"}
 
+def delete_objects_direct(params):
+    """直接批量删除对象(无异步)"""
+    names = params.get("names", [])
+    flush = params.get("flush", False)
+    
+    objects = [bpy.data.objects[name] for name in names if name in bpy.data.objects]
+    missing = [name for name in names if name not in bpy.data.objects]
+    # batch_remove 一次性移除所有对象，比逐个 remove 少很多次依赖图更新
+    bpy.data.batch_remove(objects)
+    if flush:
+        bpy.context.view_layer.update()
+    
+    return {
+        "status": "success",
+        "message": f"已删除 {len(objects)} 个对象",
+        "deleted": len(objects),
+        "missing": missing
+    }
+
+def create_linked_instance_direct(params):
+    """直接创建关联实例(无异步)
+
+    实例与源对象共享网格数据和数据级材质，只有变换是独立的
+    """
+    source_name = params.get("source_name", None)
+    instance_name = params.get("instance_name", None)
+    location = params.get("location", None)
+    
+    if not source_name or source_name not in bpy.data.objects:
+        return {"status": "error", "message": f"对象不存在: {source_name}"}
+    
+    # Object.copy() 只复制对象本身，data 仍指向源对象的网格
+    source = bpy.data.objects[source_name]
+    obj = source.copy()
+    if instance_name:
+        obj.name = instance_name
+    if location:
+        obj.location = location
+    bpy.context.collection.objects.link(obj)
+    
+    return {
+        "status": "success",
+        "message": f"已创建 {source_name} 的关联实例",
+        "object_name": obj.name
+    }
+
+def create_linked_instances_direct(params):
+    """直接批量创建关联实例(无异步)"""
+    items = [create_linked_instance_direct(item) for item in params.get("items", [])]
+    
+    return {
+        "status": "success",
+        "message": f"已创建 {len(items)} 个关联实例",
+        "items": items
+    }
+
+def set_material_direct(params):
+    """直接为对象设置材质(无异步)
+
+    材质不存在时创建，设置在对象的网格数据上，共享网格的关联实例一并生效
+    """
+    object_name = params.get("object_name", None)
+    material_name = params.get("material_name", None) or f"{object_name}_material"
+    color = params.get("color", None)
+    create_if_missing = params.get("create_if_missing", True)
+    
+    if not object_name or object_name not in bpy.data.objects:
+        return {"status": "error", "message": f"对象不存在: {object_name}"}
+    
+    obj = bpy.data.objects[object_name]
+    if obj.data is None or not hasattr(obj.data, "materials"):
+        return {"status": "error", "message": f"对象不支持材质: {object_name}"}
+    
+    if material_name in bpy.data.materials:
+        material = bpy.data.materials[material_name]
+    elif create_if_missing:
+        material = bpy.data.materials.new(name=material_name)
+    else:
+        return {"status": "error", "message": f"材质不存在: {material_name}"}
+    
+    if color is not None:
+        color = list(color)
+        if len(color) == 3:
+            color.append(1.0)
+        material.use_nodes = True
+        principled_bsdf = material.node_tree.nodes.get('Principled BSDF')
+        if principled_bsdf:
+            principled_bsdf.inputs['Base Color'].default_value = color
+        else:
+            material.diffuse_color = color
+    
+    if obj.data.materials:
+        obj.data.materials[0] = material
+    else:
+        obj.data.materials.append(material)
+    
+    return {
+        "status": "success",
+        "message": f"已将材质 {material.name} 应用到对象 {object_name}",
+        "material_name": material.name
+    }
+
+def set_materials_direct(params):
+    """直接批量设置材质(无异步)"""
+    items = [set_material_direct(item) for item in params.get("items", [])]
+    
+    return {
+        "status": "success",
+        "message": f"已设置 {len(items)} 个对象的材质",
+        "items": items
+    }
+
 # ========== 服务器端函数（通过IPC调用） ==========
 
 def create_cube(params):
@@ -120,6 +295,10 @@ def create_cylinder(params):
     """创建圆柱体"""
     return request_blender_operation("create_cylinder", params)
 
+def create_objects(params):
+    """批量创建对象"""
+    return request_blender_operation("create_objects", params)
+
 def transform_object(params):
     """变换对象"""
     return request_blender_operation("transform_object", params)
@@ -128,6 +307,22 @@ def delete_object(params):
     """删除对象"""
     return request_blender_operation("delete_object", params)
 
+def delete_objects(params):
+    """批量删除对象"""
+    return request_blender_operation("delete_objects", params)
+
+def create_linked_instance(params):
+    """创建关联实例"""
+    return request_blender_operation("create_linked_instance", params)
+
+def create_linked_instances(params):
+    """批量创建关联实例"""
+    return request_blender_operation("create_linked_instances", params)
+
+def set_materials(params):
+    """批量设置材质"""
+    return request_blender_operation("set_materials", params)
+
 # ========== 注册工具 ==========
 
 def register_object_tools(adapter):
@@ -172,6 +367,17 @@ def register_object_tools(adapter):
         ]
     )
     
+    # 注册批量创建对象工具
+    register_blender_tool(
+        adapter,
+        "create_objects", 
+        create_objects,
+        "在一次请求中批量创建对象",
+        [
+            {"name": "items", "type": "array", "description": "对象参数列表，每项包含type、name、location、rotation、scale", "required": True}
+        ]
+    )
+    
     # 注册变换对象工具
     register_blender_tool(
         adapter,
@@ -196,3 +402,50 @@ def register_object_tools(adapter):
             {"name": "object_name", "type": "string", "description": "对象名称", "required": True}
         ]
     )
+    
+    # 注册批量删除对象工具
+    register_blender_tool(
+        adapter,
+        "delete_objects", 
+        delete_objects,
+        "批量删除对象",
+        [
+            {"name": "names", "type": "array", "description": "对象名称列表", "required": True},
+            {"name": "flush", "type": "boolean", "description": "删除后立即更新视图层", "default": False}
+        ]
+    )
+    
+    # 注册创建关联实例工具
+    register_blender_tool(
+        adapter,
+        "create_linked_instance", 
+        create_linked_instance,
+        "创建与源对象共享网格数据的关联实例",
+        [
+            {"name": "source_name", "type": "string", "description": "源对象名称", "required": True},
+            {"name": "instance_name", "type": "string", "description": "实例名称"},
+            {"name": "location", "type": "array", "description": "实例位置 [x, y, z]"}
+        ]
+    )
+    
+    # 注册批量创建关联实例工具
+    register_blender_tool(
+        adapter,
+        "create_linked_instances", 
+        create_linked_instances,
+        "在一次请求中批量创建关联实例",
+        [
+            {"name": "items", "type": "array", "description": "实例参数列表，每项包含source_name、instance_name、location", "required": True}
+        ]
+    )
+    
+    # 注册批量设置材质工具
+    register_blender_tool(
+        adapter,
+        "set_materials", 
+        set_materials,
+        "在一次请求中批量为对象设置材质",
+        [
+            {"name": "items", "type": "array", "description": "材质参数列表，每项包含object_name、material_name、color", "required": True}
+        ]
+    )
@@ -6,19 +6,7 @@ BlenderMCP工具辅助函数
 
 import json
 import logging
-import tempfile
-import os
 
-# 设置日志
-log_file = os.path.join(tempfile.gettempdir(), "blendermcp_tools.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("BlenderMCP.Tools")
 
 # 判断是否在Blender环境中运行
@@ -2,6 +2,32 @@
 模拟Blender Python API (bpy)模块
 """
 
+class Collection(list):
+    """模拟Blender的数据集合，可以按名称或下标访问"""
+    
+    def __init__(self, factory=None):
+        super().__init__()
+        self._factory = factory
+        
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return any(item.name == key for item in self)
+        return super().__contains__(key)
+        
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for item in self:
+                if item.name == key:
+                    return item
+            raise KeyError(key)
+        return super().__getitem__(key)
+        
+    def new(self, name, *args, **kwargs):
+        """创建新的数据块"""
+        item = self._factory(name, *args, **kwargs)
+        self.append(item)
+        return item
+
 class Object:
     """模拟Blender对象"""
     
@@ -13,6 +39,14 @@ class Object:
         self.scale = (1, 1, 1)
         self.data = None
         
+    def copy(self):
+        """复制对象，数据块仍与源对象共享"""
+        obj = Object(name=f"{self.name}.001", type=self.type)
+        obj.rotation_euler = self.rotation_euler
+        obj.scale = self.scale
+        obj.data = self.data
+        return obj
+        
 class Mesh:
     """模拟Blender网格"""
     
@@ -21,6 +55,13 @@ class Mesh:
         self.vertices = []
         self.edges = []
         self.faces = []
+        self.materials = []
+        
+class NodeTree:
+    """模拟Blender节点树"""
+    
+    def __init__(self):
+        self.nodes = {}
         
 class Material:
     """模拟Blender材质"""
@@ -28,7 +69,21 @@ class Material:
     def __init__(self, name=""):
         self.name = name
         self.use_nodes = False
-        self.node_tree = None
+        self.node_tree = NodeTree()
+        self.diffuse_color = (0.8, 0.8, 0.8, 1.0)
+        
+class Light:
+    """模拟Blender灯光"""
+    
+    def __init__(self, name="", type="POINT"):
+        self.name = name
+        self.type = type
+        
+class Camera:
+    """模拟Blender相机"""
+    
+    def __init__(self, name=""):
+        self.name = name
         
 class Scene:
     """模拟Blender场景"""
@@ -37,23 +92,74 @@ class Scene:
         self.name = name
         self.objects = []
         
+class SceneCollection:
+    """模拟Blender场景中的集合"""
+    
+    class _Objects:
+        def link(self, obj):
+            """把对象链接到场景"""
+            data.objects.append(obj)
+            
+    def __init__(self):
+        self.objects = self._Objects()
+        
+class ViewLayer:
+    """模拟Blender视图层"""
+    
+    def __init__(self):
+        self.update_count = 0
+        
+    def update(self):
+        """更新视图层"""
+        self.update_count += 1
+        
 class Context:
     """模拟Blender上下文"""
     
     def __init__(self):
         self.scene = Scene()
         self.object = None
+        self.active_object = None
         self.selected_objects = []
+        self.collection = SceneCollection()
+        self.view_layer = ViewLayer()
         
 class Data:
     """模拟Blender数据"""
     
     def __init__(self):
-        self.objects = []
-        self.meshes = []
-        self.materials = []
+        self.objects = Collection(lambda name, object_data=None: _new_object(name, object_data))
+        self.meshes = Collection(Mesh)
+        self.materials = Collection(Material)
+        self.lights = Collection(Light)
+        self.cameras = Collection(Camera)
         self.scenes = [Scene()]
         
+    def batch_remove(self, ids):
+        """一次移除多个数据块"""
+        for item in list(ids):
+            for collection in (self.objects, self.meshes, self.materials, self.lights, self.cameras):
+                if item in collection:
+                    collection.remove(item)
+        
+def _new_object(name, object_data=None):
+    """按数据块创建对象，与bpy.data.objects.new相同"""
+    obj = Object(name=name, type="EMPTY" if object_data is None else type(object_data).__name__.upper())
+    obj.data = object_data
+    return obj
+
+def _add_mesh_object(prefix, location):
+    """创建网格对象并设为活动对象，与mesh.primitive_*_add相同"""
+    mesh = Mesh(name=f"{prefix}_{len(data.meshes)}")
+    data.meshes.append(mesh)
+    
+    obj = Object(name=f"{prefix}_{len(data.objects)}", type="MESH")
+    obj.location = location
+    obj.data = mesh
+    data.objects.append(obj)
+    context.active_object = obj
+    return {"FINISHED"}
+        
 class Ops:
     """模拟Blender操作"""
     
@@ -75,26 +181,32 @@ class Ops:
         @staticmethod
         def primitive_cube_add(size=2.0, location=(0, 0, 0)):
             """添加立方体"""
-            mesh = Mesh(name=f"Cube_{len(data.meshes)}")
-            data.meshes.append(mesh)
-            
-            obj = Object(name=f"Cube_{len(data.objects)}", type="MESH")
-            obj.location = location
-            obj.data = mesh
-            data.objects.append(obj)
-            return {"FINISHED"}
+            return _add_mesh_object("Cube", location)
             
         @staticmethod
-        def primitive_uv_sphere_add(radius=1.0, location=(0, 0, 0)):
+        def primitive_uv_sphere_add(radius=1.0, location=(0, 0, 0), **kwargs):
             """添加UV球体"""
-            mesh = Mesh(name=f"Sphere_{len(data.meshes)}")
-            data.meshes.append(mesh)
+            return _add_mesh_object("Sphere", location)
             
-            obj = Object(name=f"Sphere_{len(data.objects)}", type="MESH")
-            obj.location = location
-            obj.data = mesh
-            data.objects.append(obj)
-            return {"FINISHED"}
+        @staticmethod
+        def primitive_cylinder_add(radius=1.0, depth=2.0, location=(0, 0, 0), **kwargs):
+            """添加圆柱体"""
+            return _add_mesh_object("Cylinder", location)
+            
+        @staticmethod
+        def primitive_plane_add(size=2.0, location=(0, 0, 0)):
+            """添加平面"""
+            return _add_mesh_object("Plane", location)
+            
+        @staticmethod
+        def primitive_cone_add(location=(0, 0, 0), **kwargs):
+            """添加圆锥"""
+            return _add_mesh_object("Cone", location)
+            
+        @staticmethod
+        def primitive_torus_add(location=(0, 0, 0), **kwargs):
+            """添加圆环"""
+            return _add_mesh_object("Torus", location)
             
     class material:
         @staticmethod
@@ -127,9 +239,18 @@ class Types:
     class Material(Material):
         pass
         
+    class Light(Light):
+        pass
+        
     class Scene(Scene):
         pass
         
+def reset():
+    """清空模拟的场景数据，测试之间互不影响"""
+    global context, data
+    context = Context()
+    data = Data()
+
 # 创建全局实例
 context = Context()
 data = Data()
@@ -137,4 +258,4 @@ ops = Ops()
 types = Types()
 
 # 导出模块变量
-__all__ = ['context', 'data', 'ops', 'types'] 
\ No newline at end of file
+__all__ = ['context', 'data', 'ops', 'types', 'reset'] 
\ No newline at end of file
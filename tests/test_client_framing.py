@@ -0,0 +1,191 @@
+"""BlenderMCP客户端长度前缀协议测试模块"""
+
+import asyncio
+import json
+import struct
+
+import pytest
+from blendermcp.client.client import BlenderMCPClient
+from blendermcp.common.errors import ConnectionError
+
+_HEADER = struct.Struct(">I")
+
+async def _read_message(reader):
+    """读取一条带长度前缀的消息"""
+    header = await reader.readexactly(_HEADER.size)
+    return json.loads(await reader.readexactly(_HEADER.unpack(header)[0]))
+
+def _frame(message):
+    """编码一条带长度前缀的消息"""
+    payload = json.dumps(message).encode("utf-8")
+    return _HEADER.pack(len(payload)) + payload
+
+async def _start_server(handler, port=0):
+    """启动模拟服务器，返回服务器和端口"""
+    server = await asyncio.start_server(handler, "127.0.0.1", port, reuse_address=True)
+    return server, server.sockets[0].getsockname()[1]
+
+async def _echo(reader, writer):
+    """把收到的命令原样作为结果返回"""
+    try:
+        while True:
+            message = await _read_message(reader)
+            writer.write(_frame({"id": message["id"], "result": message}))
+            await writer.drain()
+    except asyncio.IncompleteReadError:
+        pass
+    finally:
+        writer.close()
+
+@pytest.fixture
+async def echo_server():
+    """回显命令的模拟服务器"""
+    server, port = await _start_server(_echo)
+    async with server:
+        yield port
+
+@pytest.fixture
+async def client(echo_server):
+    """连接到模拟服务器的客户端"""
+    client = BlenderMCPClient("127.0.0.1", echo_server, timeout=2)
+    await client.start()
+    yield client
+    await client.stop()
+
+async def test_send_command_roundtrip(client):
+    """测试命令和响应按ID对应"""
+    response = await client.send_command("get_scene_info", {"depth": 1})
+
+    assert response["result"]["type"] == "get_scene_info"
+    assert response["result"]["params"] == {"depth": 1}
+
+async def test_concurrent_commands(client):
+    """测试并发命令合并写入后，响应仍交给对应的调用方"""
+    responses = await asyncio.gather(
+        *(client.send_command("echo", {"index": i}) for i in range(50))
+    )
+
+    assert [r["result"]["params"]["index"] for r in responses] == list(range(50))
+
+async def test_unserializable_params(client):
+    """测试无法序列化的参数只影响本次调用，写任务继续工作"""
+    with pytest.raises(TypeError):
+        await client.send_command("bad", {"x": object()})
+
+    assert client.connected
+    assert not client._pending
+    response = await client.send_command("good")
+    assert response["result"]["type"] == "good"
+
+async def test_connection_closed():
+    """测试服务器关闭连接时等待中的命令以ConnectionError结束"""
+    async def close_after_read(reader, writer):
+        await _read_message(reader)
+        writer.close()
+
+    server, port = await _start_server(close_after_read)
+    async with server:
+        client = BlenderMCPClient("127.0.0.1", port, timeout=2)
+        await client.start()
+        try:
+            with pytest.raises(ConnectionError):
+                await client.send_command("get_scene_info")
+        finally:
+            await client.stop()
+
+async def test_send_after_server_closed():
+    """测试服务器已关闭连接后发送命令立即以ConnectionError结束，而不是等到超时"""
+    async def close_immediately(reader, writer):
+        writer.close()
+
+    server, port = await _start_server(close_immediately)
+    async with server:
+        client = BlenderMCPClient("127.0.0.1", port, timeout=5)
+        await client.start()
+        try:
+            # 等待读取任务发现连接已关闭
+            await asyncio.wait_for(asyncio.shield(client._tasks[1]), 1)
+            assert not client.connected
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(client.send_command("get_scene_info"), 1)
+        finally:
+            await client.stop()
+
+async def test_malformed_response():
+    """测试收到无法解析的响应时等待中的命令以ConnectionError结束"""
+    async def reply_garbage(reader, writer):
+        await _read_message(reader)
+        writer.write(b"\x00\x00\x00\x03abc")
+        await writer.drain()
+        try:
+            await reader.read()
+        finally:
+            writer.close()
+
+    server, port = await _start_server(reply_garbage)
+    async with server:
+        client = BlenderMCPClient("127.0.0.1", port, timeout=5)
+        await client.start()
+        try:
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(client.send_command("get_scene_info"), 1)
+            assert not client.connected
+        finally:
+            await client.stop()
+
+async def test_write_failure(client):
+    """测试写入失败时等待中的命令以ConnectionError结束，之后的命令不再排队"""
+    def broken_write(data):
+        raise OSError("broken pipe")
+    client._writer.write = broken_write
+
+    with pytest.raises(ConnectionError):
+        await asyncio.wait_for(client.send_command("get_scene_info"), 1)
+    with pytest.raises(ConnectionError):
+        await client.send_command("get_scene_info")
+
+async def test_command_timeout():
+    """测试服务器不响应时命令超时，且不留下等待中的请求"""
+    async def never_reply(reader, writer):
+        try:
+            await reader.read()
+        finally:
+            writer.close()
+
+    server, port = await _start_server(never_reply)
+    async with server:
+        client = BlenderMCPClient("127.0.0.1", port, timeout=0.1)
+        await client.start()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await client.send_command("get_scene_info")
+            assert not client._pending
+        finally:
+            await client.stop()
+
+async def test_send_without_connection():
+    """测试未连接时发送命令"""
+    with pytest.raises(ConnectionError):
+        await BlenderMCPClient().send_command("get_scene_info")
+
+def test_get_shared_across_event_loops():
+    """测试共享客户端在多次asyncio.run()之间各自使用当前事件循环"""
+    async def run_once(port=0):
+        server, port = await _start_server(_echo, port)
+        client = await BlenderMCPClient.get_shared("127.0.0.1", port)
+        assert client is await BlenderMCPClient.get_shared("127.0.0.1", port)
+        response = await client.send_command("ping")
+        assert response["result"]["type"] == "ping"
+        # 连接保持打开，由asyncio.run()结束时取消剩余的任务
+        server.close()
+        return client, port
+
+    try:
+        first, port = asyncio.run(run_once())
+        # 第一个循环结束时没有调用close_shared()，第二个循环不能复用它留下的连接
+        second, _ = asyncio.run(run_once(port))
+        assert second is not first
+        # 已关闭的循环留下的客户端在下一次获取时被丢弃
+        assert len(BlenderMCPClient._shared) == 1
+    finally:
+        BlenderMCPClient._shared.clear()
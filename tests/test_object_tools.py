@@ -0,0 +1,92 @@
+"""BlenderMCP对象工具批量处理函数测试模块"""
+
+import pytest
+import bpy
+from blendermcp.tools import object_tools
+
+@pytest.fixture(autouse=True)
+def scene():
+    """每个测试使用空的模拟场景"""
+    bpy.reset()
+    yield bpy.data
+
+def test_create_objects_direct():
+    """测试批量创建对象，结果按请求顺序返回"""
+    response = object_tools.create_objects_direct({"items": [
+        {"type": "MESH", "name": "board", "location": [0, 0, -0.1], "scale": [4, 4, 0.2]},
+        {"type": "SPHERE", "name": "ball", "rotation": [0, 0, 1]},
+        {"type": "LIGHT", "name": "lamp", "location": [0, 0, 5]},
+        {"type": "UNKNOWN"},
+    ]})
+
+    assert response["status"] == "success"
+    items = response["items"]
+    assert [item.get("object_name") for item in items[:3]] == ["board", "ball", "lamp"]
+    assert items[3]["status"] == "error"
+
+    board = bpy.data.objects["board"]
+    assert board.scale == [4, 4, 0.2]
+    assert bpy.data.objects["ball"].rotation_euler == [0, 0, 1]
+    assert bpy.data.objects["lamp"].data in bpy.data.lights
+
+def test_set_materials_direct():
+    """测试批量设置材质，材质不存在时创建并设置在网格数据上"""
+    object_tools.create_objects_direct({"items": [{"name": "a"}, {"name": "b"}]})
+
+    response = object_tools.set_materials_direct({"items": [
+        {"object_name": "a", "material_name": "white", "color": [1, 1, 1]},
+        {"object_name": "b", "material_name": "white"},
+        {"object_name": "missing", "material_name": "black"},
+    ]})
+
+    items = response["items"]
+    assert [item["status"] for item in items] == ["success", "success", "error"]
+    white = bpy.data.materials["white"]
+    assert white.diffuse_color == [1, 1, 1, 1.0]
+    assert bpy.data.objects["a"].data.materials == [white]
+    assert bpy.data.objects["b"].data.materials == [white]
+    assert "black" not in bpy.data.materials
+
+def test_set_material_without_create():
+    """测试create_if_missing为false时不创建材质"""
+    object_tools.create_objects_direct({"items": [{"name": "a"}]})
+
+    response = object_tools.set_material_direct(
+        {"object_name": "a", "material_name": "gold", "create_if_missing": False}
+    )
+
+    assert response["status"] == "error"
+    assert "gold" not in bpy.data.materials
+
+def test_create_linked_instances_direct():
+    """测试批量创建关联实例，实例与源对象共享网格数据"""
+    object_tools.create_objects_direct({"items": [{"name": "pawn"}]})
+    source = bpy.data.objects["pawn"]
+
+    response = object_tools.create_linked_instances_direct({"items": [
+        {"source_name": "pawn", "instance_name": "pawn_2", "location": [1, 0, 0]},
+        {"source_name": "pawn", "instance_name": "pawn_3", "location": [2, 0, 0]},
+        {"source_name": "missing"},
+    ]})
+
+    items = response["items"]
+    assert [item["status"] for item in items] == ["success", "success", "error"]
+    for name, x in (("pawn_2", 1), ("pawn_3", 2)):
+        instance = bpy.data.objects[name]
+        assert instance.data is source.data
+        assert instance.location == [x, 0, 0]
+
+def test_delete_objects_direct():
+    """测试批量删除对象，只在需要时更新视图层"""
+    object_tools.create_objects_direct({"items": [{"name": "a"}, {"name": "b"}, {"name": "c"}]})
+
+    response = object_tools.delete_objects_direct({"names": ["a", "b", "missing"]})
+
+    assert response["deleted"] == 2
+    assert response["missing"] == ["missing"]
+    assert [obj.name for obj in bpy.data.objects] == ["c"]
+    assert bpy.context.view_layer.update_count == 0
+
+    object_tools.delete_objects_direct({"names": ["c"], "flush": True})
+    assert len(bpy.data.objects) == 0
+    assert bpy.context.view_layer.update_count == 1